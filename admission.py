@@ -0,0 +1,102 @@
+"""
+admission.py
+Admission control and load shedding for the API routes.
+
+Routes are grouped into classes ("upstream" for TMDb-bound routes, "local"
+for SQLite-only routes), each with its own Bulkhead: at most
+`max_in_flight` requests run at once and at most `max_queue` wait for a
+slot. When the queue is full, or a slot does not free up before the
+request's deadline, the request is rejected straight away (Overloaded ->
+503 + Retry-After) instead of tying up a worker. Because each class has
+separate capacity, a TMDb slowdown cannot starve the watchlist routes.
+
+Every admitted request carries a deadline (the client's X-Request-Timeout,
+capped by the server default). time_left() exposes it to downstream code,
+so upstream calls are bounded by it and work is abandoned once the client
+has given up. The deadline is a ContextVar, so background threads (cache
+refreshes, graph refresher) are not bound by any request's deadline.
+"""
+
+import contextvars
+import threading
+import time
+from contextlib import contextmanager
+
+_deadline = contextvars.ContextVar("request_deadline", default=None)
+
+class Overloaded(Exception):
+    """Raised when a request is shed; `retry_after` is a hint in seconds."""
+    def __init__(self, message, retry_after=1):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+def deadline_from(header_value, default_timeout):
+    """Monotonic deadline from an X-Request-Timeout value (seconds), capped by the default."""
+    timeout = default_timeout
+    if header_value:
+        try:
+            timeout = min(timeout, max(0.0, float(header_value)))
+        except ValueError:
+            pass
+    return time.monotonic() + timeout
+
+def time_left():
+    """Seconds left before the current request's deadline, or None outside a request."""
+    deadline = _deadline.get()
+    return None if deadline is None else deadline - time.monotonic()
+
+class Bulkhead:
+    def __init__(self, name, max_in_flight, max_queue, queue_timeout=2.0, retry_after=1):
+        self.name = name
+        self.max_in_flight = max_in_flight
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.retry_after = retry_after
+        self.in_flight = 0
+        self.waiting = 0
+        self.shed = 0
+        self._cond = threading.Condition()
+
+    def acquire(self, deadline):
+        """Takes a slot, waiting in the bounded queue if needed; raises Overloaded."""
+        with self._cond:
+            # Newcomers queue behind existing waiters rather than overtaking them.
+            if self.in_flight < self.max_in_flight and not self.waiting:
+                self.in_flight += 1
+                return
+            if self.waiting >= self.max_queue:
+                self.shed += 1
+                raise Overloaded(f"{self.name}: too many requests queued", self.retry_after)
+            give_up = min(time.monotonic() + self.queue_timeout, deadline)
+            self.waiting += 1
+            try:
+                while self.in_flight >= self.max_in_flight:
+                    left = give_up - time.monotonic()
+                    if left <= 0:
+                        self.shed += 1
+                        raise Overloaded(f"{self.name}: timed out waiting for capacity",
+                                         self.retry_after)
+                    self._cond.wait(left)
+                self.in_flight += 1
+            finally:
+                self.waiting -= 1
+
+    def release(self):
+        with self._cond:
+            self.in_flight -= 1
+            self._cond.notify()
+
+    @contextmanager
+    def admit(self, deadline):
+        """Runs the block holding a slot, with `deadline` visible to time_left()."""
+        self.acquire(deadline)
+        token = _deadline.set(deadline)
+        try:
+            yield
+        finally:
+            _deadline.reset(token)
+            self.release()
+
+    def stats(self):
+        with self._cond:
+            return {"in_flight": self.in_flight, "waiting": self.waiting, "shed": self.shed}
@@ -7,63 +7,301 @@ Flask back-end for CineMate:
  - Renders the single-page front-end ('movie.html') as our 'View'
 
 Follows a light MVC pattern:
- - Model: watchlist.db + DB queries
+ - Model: watchlist.db + DB queries (db.py)
  - View:  movie.html (+ JavaScript)
  - Controller: Flask routes bridging the model & view
 
 Includes error handling using try/except blocks and verifies HTTP status codes.
 
+The app is built by create_app(config); importing this module does no I/O.
+Optional subsystems (TMDb HTTP client, ...) are constructed on first use.
+
 """
 
+import functools
+import math
+import mimetypes
+import os
 import sqlite3
-import requests
-from flask import Flask, jsonify, request, render_template
+import click
+from flask import (Blueprint, Flask, Response, abort, current_app, jsonify, request,
+                   render_template, send_from_directory, stream_with_context, url_for)
 from flask_cors import CORS
+from werkzeug.security import safe_join
+
+import admission
+import assets
+import db
+import transfer
+from catalog import CatalogStore, CatalogWriter
+from facets import FacetIndex
+from graph import GraphRefresher, personalized_pagerank
+from plotsearch import IndexNotReady, PlotIndex
+from ranking import Ranker, feedback_weight
+from serialization import make_json_provider, parse_fields, project, wants
+from writebehind import WriteBehindQueue
+from resilience import CircuitBreaker, ResponseCache, TieredCache
+from tmdb import TMDbClient, TMDbError, poster_url
 
 # -------------------------------------------------------------------------
-# FLASK APP SETUP
+# CONFIG & APP FACTORY
 # -------------------------------------------------------------------------
-app = Flask(__name__, template_folder="templates", static_folder="static")
-CORS(app)
+class Config:
+    """Default settings. Override by passing an object or dict to create_app()."""
+    DATABASE = "watchlist.db"
+    # Number of SQLite files user watchlists are spread across (see db.py)
+    DATABASE_SHARDS = 1
+    DEFAULT_USER = db.DEFAULT_USER
+    # Queue rating/feedback updates in memory and flush them in batches
+    WRITE_BEHIND = False
+    WRITE_BEHIND_INTERVAL = 0.5      # seconds between flushes
+    WRITE_BEHIND_MAX_PENDING = 500   # rows queued before an early flush
+    # TMDb v3 API key (replace if needed)
+    TMDB_API_KEY = "03fb23d2e8ca73070c3bdb09bf268ae6"
+    TMDB_BASE_URL = "https://api.themoviedb.org/3"
+    TMDB_TIMEOUT = 10
+    TMDB_MIN_TIMEOUT = 0.25        # less than this left of the request deadline: 504, no call
+    # Upstream resilience (see tmdb.py / resilience.py); times in seconds
+    TMDB_CACHE_MAX_ENTRIES = 4096
+    TMDB_CACHE_TTL = 600           # served as fresh
+    TMDB_CACHE_STALE_TTL = 86400   # served stale while refreshing in background
+    TMDB_NEGATIVE_TTL = 60         # 404s
+    # Cross-worker cache file shared by every worker on the host (sharedcache.py,
+    # Unix only), e.g. "/dev/shm/cinemate-tmdb.cache"; None = per-process only
+    TMDB_SHARED_CACHE = None
+    TMDB_SHARED_CACHE_SIZE = 64 * 2**20   # bytes of payload data
+    TMDB_SHARED_CACHE_SLOTS = 65536       # index entries
+    TMDB_BREAKER_THRESHOLD = 0.5   # failure ratio that opens the circuit
+    TMDB_BREAKER_MIN_CALLS = 10
+    TMDB_BREAKER_WINDOW = 30
+    TMDB_BREAKER_COOLDOWN = 30
+    # "auto" (orjson if installed), "orjson" or "std"
+    JSON_SERIALIZER = "auto"
+    # Rows per fetchmany() on export / per commit on import
+    TRANSFER_BATCH_SIZE = 500
+    # Local movie catalog + similar-movie graph (catalog.py / graph.py)
+    CATALOG_DATABASE = "catalog.db"
+    # "graph" (personalized PageRank over the local graph) or
+    # "similar" (one TMDb /similar call per watchlist entry)
+    RECOMMENDER = "graph"
+    GRAPH_MAX_AGE = 7 * 86400      # seconds before a movie's edges are refreshed
+    GRAPH_SYNC_FETCH = 3           # unseen seeds fetched inline per request
+    GRAPH_EXPAND = 10              # frontier movies queued for fetching per request
+    GRAPH_ALPHA = 0.75
+    GRAPH_EPSILON = 1e-3
+    # Memory-mapped TF-IDF index of catalog overviews (plotsearch.py)
+    PLOT_INDEX = "plot_index.bin"
+    PLOT_INDEX_REBUILD_MIN = 1000    # changed overviews before a background rebuild
+    PLOT_SEARCH_LIMIT = 20
+    RECOMMENDATIONS_PAGE_SIZE = 20
+    RECOMMENDATIONS_MAX_PAGE_SIZE = 100
+    # Admission control (admission.py): per route class, (requests running at
+    # once, requests waiting for a slot); anything beyond is shed with a 503
+    ADMISSION_LIMITS = {"upstream": (16, 32), "local": (32, 128)}
+    ADMISSION_QUEUE_TIMEOUT = 2.0    # seconds a request may wait for a slot
+    ADMISSION_RETRY_AFTER = 1        # Retry-After (seconds) on shed responses
+    REQUEST_TIMEOUT = 15.0           # deadline when the client sends no X-Request-Timeout
+    TEMPLATE_FOLDER = "templates"
+    STATIC_FOLDER = "static"
+    # Output of `flask assets-build`, inside STATIC_FOLDER, served from /assets/
+    ASSET_DIR = "dist"
+    ASSET_MAX_AGE = 365 * 86400
 
-# TMDb v3 API key (replace if needed)
-TMDB_API_KEY = "03fb23d2e8ca73070c3bdb09bf268ae6"
+bp = Blueprint("cinemate", __name__, cli_group=None)
 
-def init_db():
+def create_app(config=None):
     """
-    Initializes watchlist.db if it doesn't exist. 
-    Creates columns for favourite, rating, feedback if missing.
+    Application factory.
+    `config` may be a class/object (uppercase attributes) or a dict.
+    Runs pending schema migrations; a current schema costs one PRAGMA read.
     """
-    try:
-        conn = sqlite3.connect("watchlist.db")
-        c = conn.cursor()
+    settings = Flask.config_class(".")
+    settings.from_object(Config)
+    if isinstance(config, dict):
+        settings.update(config)
+    elif config is not None:
+        settings.from_object(config)
 
-        # 1) Create table if not present
-        c.execute("""
-            CREATE TABLE IF NOT EXISTS watchlist (
-                movie_id INTEGER PRIMARY KEY,
-                favourite INTEGER DEFAULT 0,
-                rating INTEGER DEFAULT 0
-            )
-        """)
-
-        # 2) Check if 'feedback' column exists
-        c.execute("PRAGMA table_info(watchlist);")
-        columns = [row[1] for row in c.fetchall()]
-        if "feedback" not in columns:
-            c.execute("ALTER TABLE watchlist ADD COLUMN feedback TEXT DEFAULT NULL;")
-            print("[DB] Added 'feedback' column to watchlist table.")
+    app = Flask(__name__,
+                template_folder=settings["TEMPLATE_FOLDER"],
+                static_folder=settings["STATIC_FOLDER"])
+    app.config.update(settings)
+    app.json = make_json_provider(app, app.config["JSON_SERIALIZER"])
+    CORS(app)
+    app.register_blueprint(bp)
 
-        conn.commit()
-        conn.close()
-        print("[DB] Initialization completed.")
-    except sqlite3.Error as db_err:
-        print(f"[DB] init_db error: {db_err}")
+    store = db.ShardedStore(db.shard_paths(app.config["DATABASE"],
+                                           app.config["DATABASE_SHARDS"]))
+    store.init()
+    app.extensions["store"] = store
+
+    catalog = CatalogStore(app.config["CATALOG_DATABASE"])
+    catalog.init()
+    app.extensions["catalog"] = catalog
+
+    app.extensions["admission"] = {
+        name: admission.Bulkhead(name, in_flight, queued,
+                                 queue_timeout=app.config["ADMISSION_QUEUE_TIMEOUT"],
+                                 retry_after=app.config["ADMISSION_RETRY_AFTER"])
+        for name, (in_flight, queued) in app.config["ADMISSION_LIMITS"].items()
+    }
+
+    if app.config["TMDB_SHARED_CACHE"]:
+        # mapped here, before a pre-fork server forks, so workers inherit it
+        from sharedcache import SharedCache
+        app.extensions["shared_cache"] = SharedCache(
+            app.config["TMDB_SHARED_CACHE"], size=app.config["TMDB_SHARED_CACHE_SIZE"],
+            slots=app.config["TMDB_SHARED_CACHE_SLOTS"])
+    return app
+
+def get_tmdb():
+    """Per-app TMDb client, built lazily on the first upstream call."""
+    ext = current_app.extensions
+    if "tmdb" not in ext:
+        cfg = current_app.config
+        cache = ResponseCache(cfg["TMDB_CACHE_MAX_ENTRIES"])
+        if "shared_cache" in ext:
+            cache = TieredCache(cache, ext["shared_cache"], fresh_ttl=cfg["TMDB_CACHE_TTL"],
+                                negative_ttl=cfg["TMDB_NEGATIVE_TTL"])
+        ext["tmdb"] = TMDbClient(
+            cfg["TMDB_API_KEY"], base_url=cfg["TMDB_BASE_URL"], timeout=cfg["TMDB_TIMEOUT"],
+            cache=cache,
+            breaker=CircuitBreaker(threshold=cfg["TMDB_BREAKER_THRESHOLD"],
+                                   min_calls=cfg["TMDB_BREAKER_MIN_CALLS"],
+                                   window=cfg["TMDB_BREAKER_WINDOW"],
+                                   cooldown=cfg["TMDB_BREAKER_COOLDOWN"]),
+            fresh_ttl=cfg["TMDB_CACHE_TTL"], stale_ttl=cfg["TMDB_CACHE_STALE_TTL"],
+            negative_ttl=cfg["TMDB_NEGATIVE_TTL"], time_left=admission.time_left,
+            min_timeout=cfg["TMDB_MIN_TIMEOUT"],
+            on_fetch=functools.partial(_remember_results, CatalogWriter(ext["catalog"])))
+    return ext["tmdb"]
+
+def get_graph_refresher():
+    """Per-app background refresher for the similar-movie graph, built on first use."""
+    ext = current_app.extensions
+    if "graph_refresher" not in ext:
+        tmdb = get_tmdb()
+        ext["graph_refresher"] = GraphRefresher(
+            ext["catalog"],
+            lambda movie_id: tmdb.get(f"/movie/{movie_id}/similar").get("results", []),
+            max_age=current_app.config["GRAPH_MAX_AGE"])
+    return ext["graph_refresher"]
+
+def get_plot_index():
+    """Per-app plot search index; a missing index file is built in the background."""
+    ext = current_app.extensions
+    if "plot_index" not in ext:
+        cfg = current_app.config
+        ext["plot_index"] = PlotIndex(ext["catalog"], cfg["PLOT_INDEX"],
+                                      rebuild_min=cfg["PLOT_INDEX_REBUILD_MIN"])
+    return ext["plot_index"]
+
+def get_facet_index():
+    """Per-app facet bitmaps over the catalog, loaded on first use."""
+    ext = current_app.extensions
+    if "facets" not in ext:
+        ext["facets"] = FacetIndex(ext["catalog"])
+    return ext["facets"]
+
+def get_write_behind():
+    """
+    Per-app write-behind queue, or None when WRITE_BEHIND is off.
+    Built on first use so its flusher thread starts in the worker process.
+    Also None once several worker processes use it: queued values are only
+    visible in their own process, so then every worker writes through.
+    """
+    cfg = current_app.config
+    if not cfg["WRITE_BEHIND"]:
+        return None
+    ext = current_app.extensions
+    if "write_behind" not in ext:
+        ext["write_behind"] = WriteBehindQueue(ext["store"],
+                                               interval=cfg["WRITE_BEHIND_INTERVAL"],
+                                               max_pending=cfg["WRITE_BEHIND_MAX_PENDING"],
+                                               lock_path=f"{cfg['DATABASE']}.write-behind.lock")
+    queue = ext["write_behind"]
+    if queue.shared():
+        queue.flush()  # no-op once drained
+        return None
+    return queue
+
+def get_asset_manifest():
+    """Built-asset manifest (see assets.py); re-read on every call in debug mode."""
+    ext = current_app.extensions
+    if current_app.debug or "asset_manifest" not in ext:
+        ext["asset_manifest"] = assets.load_manifest(current_app.static_folder,
+                                                     current_app.config["ASSET_DIR"])
+    return ext["asset_manifest"]
+
+# -------------------------------------------------------------------------
+# ADMISSION CONTROL (see admission.py)
+# -------------------------------------------------------------------------
+def admit(route_class):
+    """
+    Runs the view inside `route_class`'s bulkhead with a request deadline;
+    answers 503 + Retry-After when that class is saturated.
+    `route_class` may be a callable picking the class per request.
+    Classes missing from ADMISSION_LIMITS are not limited.
+    """
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            name = route_class() if callable(route_class) else route_class
+            gate = current_app.extensions["admission"].get(name)
+            if gate is None:
+                return view(*args, **kwargs)
+            deadline = admission.deadline_from(request.headers.get("X-Request-Timeout"),
+                                               current_app.config["REQUEST_TIMEOUT"])
+            try:
+                with gate.admit(deadline):
+                    return view(*args, **kwargs)
+            except admission.Overloaded as err:
+                print(f"[Admission] shed {request.path}: {err} {gate.stats()}")
+                resp = jsonify({"error": f"Server busy ({err}), retry later"})
+                resp.status_code = 503
+                resp.headers["Retry-After"] = str(err.retry_after)
+                return resp
+        return wrapper
+    return decorator
+
+# -------------------------------------------------------------------------
+# STATIC ASSETS (fingerprinted build output)
+# -------------------------------------------------------------------------
+@bp.app_template_global()
+def asset_url(filename):
+    """
+    URL for a static file: its fingerprinted build when `flask assets-build`
+    has produced one, else the plain /static/ file.
+    """
+    built = get_asset_manifest().get(filename)
+    if built is None:
+        return url_for("static", filename=filename)
+    return url_for("cinemate.built_asset", filename=built)
+
+@bp.route('/assets/<path:filename>')
+def built_asset(filename):
+    """
+    Serves a fingerprinted file. Its name changes with its content, so it is
+    cacheable forever; a precompressed .br / .gz sibling is sent when the
+    client accepts it.
+    """
+    folder = os.path.join(current_app.static_folder, current_app.config["ASSET_DIR"])
+    if not assets.is_built(filename) or safe_join(folder, filename) is None:
+        abort(404)
+    served, encoding = assets.precompressed(folder, filename, request.accept_encodings)
+    resp = send_from_directory(folder, served,
+                               mimetype=mimetypes.guess_type(filename)[0],
+                               max_age=current_app.config["ASSET_MAX_AGE"])
+    resp.cache_control.immutable = True
+    resp.vary.add("Accept-Encoding")
+    if encoding:
+        resp.headers["Content-Encoding"] = encoding
+    return resp
 
 # -------------------------------------------------------------------------
 # HOME ROUTE
 # -------------------------------------------------------------------------
-@app.route('/')
+@bp.route('/')
 def home():
     """
     Renders the single-page front-end (movie.html),
@@ -74,7 +312,12 @@ def home():
 # -------------------------------------------------------------------------
 # SEARCH & DISCOVER (TMDb)
 # -------------------------------------------------------------------------
-@app.route('/api/search', methods=['GET'])
+def _search_class():
+    """mode=plot is answered from the local index, everything else from TMDb."""
+    return "local" if request.args.get("mode") == "plot" else "upstream"
+
+@bp.route('/api/search', methods=['GET'])
+@admit(_search_class)
 def search_movies():
     """
     GET /api/search
@@ -83,29 +326,27 @@ def search_movies():
      -> &genre=28
      -> &minRating=7.5
      -> &sort=popularity.desc
+     -> &fields=id,title,poster_url,rating   (optional projection)
+     -> &mode=plot   (match 'query' against movie overviews in the local catalog)
     If 'query' given => /search/movie
     else => /discover/movie with optional year, genre, rating, sort
     Returns JSON: {"results":[...]}
     """
-    base_url_search = "https://api.themoviedb.org/3/search/movie"
-    base_url_discover = "https://api.themoviedb.org/3/discover/movie"
-
+    fields = parse_fields(request.args.get("fields"))
     q = request.args.get("query")
+    if request.args.get("mode") == "plot":
+        return _search_plots(q, fields)
     year = request.args.get("year")
     genre = request.args.get("genre")
     min_rating = request.args.get("minRating")
     sort = request.args.get("sort")
 
-    tmdb_params = {
-        "api_key": TMDB_API_KEY,
-        "language": "en-US",
-        "include_adult": "false"
-    }
+    tmdb_params = {"include_adult": "false"}
     try:
         if q:
             # Search
             tmdb_params["query"] = q
-            resp = requests.get(base_url_search, params=tmdb_params)
+            data = get_tmdb().get("/search/movie", **tmdb_params).get("results", [])
         else:
             # Discover
             if year:
@@ -117,199 +358,358 @@ def search_movies():
             if sort:
                 tmdb_params["sort_by"] = sort
 
-            resp = requests.get(base_url_discover, params=tmdb_params)
-
-        resp.raise_for_status()
-        data = resp.json().get("results", [])
+            data = get_tmdb().get("/discover/movie", **tmdb_params).get("results", [])
 
         final_results = []
         for movie in data:
-            final_results.append({
+            final_results.append(project({
                 "id": movie["id"],
                 "title": movie.get("title", "N/A"),
                 "overview": movie.get("overview", "No synopsis available"),
                 "release_date": movie.get("release_date", "Unknown"),
                 "rating": movie.get("vote_average", "N/A"),
-                "poster_url": (
-                    f"https://image.tmdb.org/t/p/w500{movie.get('poster_path')}"
-                    if movie.get("poster_path")
-                    else "https://via.placeholder.com/500x750?text=No+Image"
-                )
-            })
+                "poster_url": poster_url(movie.get("poster_path"))
+            }, fields))
 
         return jsonify({"results": final_results})
 
-    except requests.exceptions.HTTPError as http_err:
-        return jsonify({"error": f"TMDb HTTP error: {http_err}"}), resp.status_code
-    except requests.exceptions.RequestException as re:
-        print(f"search_movies error: {re}")
+    except TMDbError as err:
+        if err.status_code:
+            return jsonify({"error": str(err)}), err.status_code
+        print(f"search_movies error: {err}")
         return jsonify({"error": "Failed to fetch search results"}), 500
 
+def _search_plots(q, fields):
+    """Plot ("search by description") results from the local TF-IDF index."""
+    if not q:
+        return jsonify({"error": "query is required for mode=plot"}), 400
+    try:
+        hits = get_plot_index().search(q, limit=current_app.config["PLOT_SEARCH_LIMIT"])
+        movies = current_app.extensions["catalog"].movies(mid for mid, _ in hits)
+    except IndexNotReady:
+        resp = jsonify({"error": "Plot search index is being built, retry shortly"})
+        resp.status_code = 503
+        resp.headers["Retry-After"] = str(current_app.config["ADMISSION_RETRY_AFTER"])
+        return resp
+    except sqlite3.Error as db_err:
+        print(f"search_movies plot DB error: {db_err}")
+        return jsonify({"error": "Failed to search plots"}), 500
+
+    final_results = []
+    for mid, score in hits:
+        movie = movies.get(mid)
+        if movie is None:
+            continue
+        final_results.append(project({
+            "id": mid,
+            "title": movie.get("title") or "N/A",
+            "overview": movie.get("overview") or "No synopsis available",
+            "release_date": movie.get("release_date") or "Unknown",
+            "rating": movie.get("vote_average") or "N/A",
+            "poster_url": poster_url(movie.get("poster_path")),
+            "score": round(score, 4),
+        }, fields))
+    return jsonify({"results": final_results})
+
+def _remember_results(writer, path, payload):
+    """
+    TMDbClient on_fetch hook: queues freshly fetched search/discover results
+    for the local catalog (feeds plot search and facets). Cache hits skip
+    this, and the write itself happens on the CatalogWriter's thread.
+    """
+    if path in ("/search/movie", "/discover/movie"):
+        writer.put(payload.get("results", []))
+
+# -------------------------------------------------------------------------
+# FACETS (local catalog)
+# -------------------------------------------------------------------------
+@bp.route('/api/facets', methods=['GET'])
+@admit("local")
+def get_facets():
+    """
+    GET /api/facets => result counts for the advanced search filters
+     -> ?year=YYYY
+     -> &genre=28,12   (all of) or 28|12 (any of)
+     -> &minRating=7.5
+    Counted over the local movie catalog (see facets.py), not all of TMDb.
+    Returns JSON: {"total": n, "catalog_size": n,
+                   "genres": [{"id", "count"}], "years": [{"from", "to", "count"}],
+                   "ratings": [{"min", "max", "count", "at_least"}]}
+    """
+    year = request.args.get("year")
+    genre = request.args.get("genre") or ""
+    min_rating = request.args.get("minRating")
+    any_genre = "|" in genre
+    try:
+        year = int(year) if year else None
+        genres = [int(g) for g in genre.replace("|", ",").split(",") if g.strip()]
+        min_rating = float(min_rating) if min_rating else None
+        if min_rating is not None and not math.isfinite(min_rating):
+            raise ValueError(min_rating)
+    except ValueError:
+        return jsonify({"error": "year and genre must be integers, minRating a number"}), 400
+
+    try:
+        counts = get_facet_index().counts(year=year, genres=genres, any_genre=any_genre,
+                                          min_rating=min_rating)
+    except sqlite3.Error as db_err:
+        print(f"GET /api/facets DB error: {db_err}")
+        return jsonify({"error": "Failed to compute facets"}), 500
+    return jsonify(counts)
+
 # -------------------------------------------------------------------------
 # MOVIE DETAILS (TMDb)
 # -------------------------------------------------------------------------
-@app.route('/api/movie/<int:movie_id>', methods=['GET'])
+@bp.route('/api/movie/<int:movie_id>', methods=['GET'])
+@admit("upstream")
 def get_movie_details(movie_id):
     """
     GET /api/movie/<movie_id> => title, overview, date, rating, cast(5), trailer
+     -> ?fields=title,poster_url   (optional projection; Cast / Trailer are
+                                    only fetched from TMDb when requested)
     """
-    base_url = "https://api.themoviedb.org/3"
-    params = {"api_key": TMDB_API_KEY, "language": "en-US"}
-
+    fields = parse_fields(request.args.get("fields"))
+    tmdb = get_tmdb()
     try:
         # Main info
-        r_main = requests.get(f"{base_url}/movie/{movie_id}", params=params)
-        r_main.raise_for_status()
-        main_data = r_main.json()
+        main_data = tmdb.get(f"/movie/{movie_id}")
 
         # Credits
-        r_credits = requests.get(f"{base_url}/movie/{movie_id}/credits", params=params)
-        r_credits.raise_for_status()
-        credits = r_credits.json()
         cast_info = []
-        for c in credits.get("cast", [])[:5]:
-            cast_info.append({"name": c.get("name","Unknown"), "character": c.get("character","")})
+        if wants(fields, "Cast"):
+            credits = tmdb.get(f"/movie/{movie_id}/credits")
+            for c in credits.get("cast", [])[:5]:
+                cast_info.append({"name": c.get("name","Unknown"), "character": c.get("character","")})
 
         # Trailer
-        r_videos = requests.get(f"{base_url}/movie/{movie_id}/videos", params=params)
-        r_videos.raise_for_status()
-        vid_data = r_videos.json()
-
         trailer_url = None
-        for v in vid_data.get("results", []):
-            if v.get("site") == "YouTube" and "trailer" in v.get("type","").lower():
-                trailer_url = f"https://www.youtube.com/watch?v={v['key']}"
-                break
+        if wants(fields, "Trailer"):
+            vid_data = tmdb.get(f"/movie/{movie_id}/videos")
+            for v in vid_data.get("results", []):
+                if v.get("site") == "YouTube" and "trailer" in v.get("type","").lower():
+                    trailer_url = f"https://www.youtube.com/watch?v={v['key']}"
+                    break
 
-        return jsonify({
+        return jsonify(project({
             "Title": main_data.get("title", "N/A"),
             "Overview": main_data.get("overview", "No synopsis available"),
             "Release Date": main_data.get("release_date", "Unknown"),
             "Rating": main_data.get("vote_average", "N/A"),
-            "Poster URL": (
-                f"https://image.tmdb.org/t/p/w500{main_data.get('poster_path')}"
-                if main_data.get("poster_path")
-                else "https://via.placeholder.com/500x750?text=No+Image"
-            ),
+            "Poster URL": poster_url(main_data.get("poster_path")),
             "Cast": cast_info,
             "Trailer": trailer_url
-        })
+        }, fields))
 
-    except requests.exceptions.HTTPError as http_err:
-        if http_err.response.status_code == 404:
+    except TMDbError as err:
+        if err.status_code == 404:
             return jsonify({"error": f"Movie with ID {movie_id} not found"}), 404
-        return jsonify({"error": f"HTTP error: {http_err}"}), http_err.response.status_code
-    except requests.exceptions.RequestException as e:
-        print(f"get_movie_details error for ID={movie_id}: {e}")
+        if err.status_code:
+            return jsonify({"error": str(err)}), err.status_code
+        print(f"get_movie_details error for ID={movie_id}: {err}")
         return jsonify({"error": "Failed to fetch movie details"}), 500
 
 # -------------------------------------------------------------------------
 # RECOMMENDATIONS (TMDb 'similar' as a naive rec system)
 # -------------------------------------------------------------------------
 def get_similar_movies(movie_id):
-    """Helper: fetch /movie/{movie_id}/similar from TMDb."""
-    url = f"https://api.themoviedb.org/3/movie/{movie_id}/similar"
-    params = {"api_key": TMDB_API_KEY, "language": "en-US"}
+    """
+    Helper: fetch /movie/{movie_id}/similar from TMDb.
+    Returns None when the source is unavailable (upstream down, nothing cached).
+    """
     try:
-        r = requests.get(url, params=params)
-        r.raise_for_status()
-        return r.json().get("results", [])
-    except requests.exceptions.RequestException as e:
+        return get_tmdb().get(f"/movie/{movie_id}/similar").get("results", [])
+    except TMDbError as e:
         print(f"get_similar_movies error: {e}")
-        return []
+        return None
 
-@app.route('/api/recommendations', methods=['GET'])
+@bp.route('/api/recommendations', methods=['GET'])
+@admit("upstream")
 def get_recommendations():
     """
     GET /api/recommendations
+     -> ?limit=20&offset=0   (paging)
+     -> &debug=1             (include score + per-source contributions)
+     -> &fields=id,title,poster_url   (optional projection)
     Implementation:
       - check watchlist DB for (movie_id, feedback)
-      - if feedback = 'not_interested' => skip
-      - if feedback = 'like' => priority 2.0
-      - if feedback = 'rated_X' => priority = X/5
-      - else default priority=1
-      - gather /similar for each, merge, sort desc by priority, deduplicate
-    Returns { "recommendations": [... in priority desc] }
+      - weight each entry by feedback (see ranking.feedback_weight):
+        'not_interested' => skip, 'like' => 2.0, 'rated_X' => X/5, else 1.0
+      - RECOMMENDER="graph": personalized PageRank over the local similar-movie
+        graph from each entry; a candidate's score is the sum over entries of
+        weight x walk score. Missing / stale edges are fetched in the background
+        (the first GRAPH_SYNC_FETCH unseen entries inline).
+      - RECOMMENDER="similar": gather /similar for each; a candidate's score is
+        the sum of the weights of every entry that recommends it
+      - drop movies already in the watchlist, select the page by top-k
+      - if TMDb is down, rank whatever sources are cached; "degraded"
+        reports that some were skipped
+    Returns { "recommendations": [... score desc], "total": <candidates>,
+              "limit": n, "offset": n, "degraded": bool }
     """
     print("[Recommendations] Generating...")
+    user_id = get_user_id()
+    fields = parse_fields(request.args.get("fields"))
+    cfg = current_app.config
+    try:
+        limit = int(request.args.get("limit", cfg["RECOMMENDATIONS_PAGE_SIZE"]))
+        offset = int(request.args.get("offset", 0))
+    except ValueError:
+        return jsonify({"error": "limit and offset must be integers"}), 400
+    if limit < 0 or offset < 0:
+        return jsonify({"error": "limit and offset must be non-negative"}), 400
+    limit = min(limit, cfg["RECOMMENDATIONS_MAX_PAGE_SIZE"])
+    debug = request.args.get("debug") in ("1", "true")
 
     try:
-        conn = get_db_connection()
+        conn = get_db_connection(user_id)
         conn.row_factory = sqlite3.Row
         c = conn.cursor()
-        c.execute("SELECT movie_id, feedback FROM watchlist")
-        rows = c.fetchall()
+        c.execute("SELECT movie_id, feedback FROM watchlist WHERE user_id = ?", (user_id,))
+        rows = [dict(r) for r in c.fetchall()]
         conn.close()
     except sqlite3.Error as db_err:
         print(f"get_recommendations DB error: {db_err}")
         return jsonify({"error": "Database error in recommendations"}), 500
 
     if not rows:
-        return jsonify({"recommendations": []})
+        return jsonify({"recommendations": [], "total": 0, "limit": limit, "offset": offset,
+                        "degraded": False})
+
+    queue = get_write_behind()
+    if queue:
+        queue.overlay(user_id, rows)
 
-    aggregated = []
+    seeds = {}
     for row in rows:
         mid = row["movie_id"]
-        fb = row["feedback"]
+        weight = feedback_weight(row["feedback"])
         # skip if not in watchlist or feedback=not_interested
-        if not mid or fb == "not_interested":
-            continue
+        if mid and weight is not None:
+            seeds[mid] = weight
+
+    ranker = Ranker(exclude=(row["movie_id"] for row in rows))
+    if cfg["RECOMMENDER"] == "graph":
+        try:
+            unavailable = _rank_from_graph(ranker, seeds, per_source=debug)
+            page = ranker.top(limit, offset)
+            movies = current_app.extensions["catalog"].movies(cid for cid, _ in page)
+        except sqlite3.Error as db_err:
+            print(f"get_recommendations catalog error: {db_err}")
+            return jsonify({"error": "Database error in recommendations"}), 500
+    else:
+        unavailable = _rank_from_similar(ranker, seeds)
+        page = ranker.top(limit, offset)
+        movies = ranker.items
 
-        # fetch similar
-        sims = get_similar_movies(mid)
-        for s in sims:
-            s["priority"] = 1.0  # default
-            if fb == "like":
-                s["priority"] = 2.0
-            elif fb.startswith("rated_"):
-                try:
-                    rating_val = int(fb.split("_")[1])
-                    s["priority"] = rating_val/5.0
-                except ValueError:
-                    pass
-            aggregated.append(s)
-
-    # sort desc by priority
-    aggregated.sort(key=lambda x: x.get("priority",1.0), reverse=True)
-    # deduplicate
-    used = set()
     final_list = []
-    for s in aggregated:
-        sid = s.get("id")
-        if sid not in used:
-            used.add(sid)
-            final_list.append({
-                "id": s["id"],
-                "title": s.get("title", "N/A"),
-                "release_date": s.get("release_date","Unknown"),
-                "rating": s.get("vote_average","N/A"),
-                "poster_url": (
-                    f"https://image.tmdb.org/t/p/w500{s.get('poster_path')}"
-                    if s.get("poster_path")
-                    else "https://via.placeholder.com/500x750?text=No+Image"
-                )
-            })
-    return jsonify({"recommendations": final_list})
+    for cid, score in page:
+        s = movies.get(cid) or {"id": cid}
+        item = {
+            "id": s["id"],
+            "title": s.get("title") or "N/A",
+            "release_date": s.get("release_date") or "Unknown",
+            "rating": s.get("vote_average") or "N/A",
+            "poster_url": poster_url(s.get("poster_path"))
+        }
+        if debug:
+            item["score"] = score
+            item["contributions"] = ranker.contributions[cid]
+        final_list.append(project(item, fields))
+    return jsonify({"recommendations": final_list, "total": len(ranker),
+                    "limit": limit, "offset": offset, "degraded": unavailable > 0})
+
+def _rank_from_similar(ranker, seeds):
+    """Adds one TMDb /similar list per seed. Returns the number of unavailable seeds."""
+    unavailable = 0
+    for mid, weight in seeds.items():
+        sims = get_similar_movies(mid)
+        if sims is None:
+            unavailable += 1
+            continue
+        ranker.add(mid, weight, sims)
+    return unavailable
+
+def _rank_from_graph(ranker, seeds, per_source=False):
+    """
+    Adds personalized-PageRank scores from the local graph.
+    PageRank is linear in its seeds, so one walk from all weighted seeds ranks
+    like the sum of per-seed walks (the push threshold is split across the
+    seeds to match, see graph.personalized_pagerank); `per_source` runs one
+    walk per seed instead, to report each seed's contribution.
+    Returns the number of seeds that have no edges yet.
+    """
+    cfg = current_app.config
+    refresher = get_graph_refresher()
+    missing, stale = refresher.needs_refresh(seeds)
+    # bootstrap a few never-seen seeds inline; everything else in the background
+    inline, later = missing[:cfg["GRAPH_SYNC_FETCH"]], missing[cfg["GRAPH_SYNC_FETCH"]:]
+    unavailable = sum(1 for mid in inline if not refresher.refresh(mid)) + len(later)
+    refresher.enqueue(later + stale)
+
+    catalog = current_app.extensions["catalog"]
+    conn = catalog.connect()
+    try:
+        edges_cache = {}
+        frontier = {}
+        if per_source:
+            walks = [(mid, weight, {mid: 1.0}) for mid, weight in seeds.items()]
+        else:
+            walks = [("graph", sum(seeds.values()), seeds)] if seeds else []
+        for source, weight, start in walks:
+            scores, dangling = personalized_pagerank(conn, start,
+                                                     alpha=cfg["GRAPH_ALPHA"],
+                                                     epsilon=cfg["GRAPH_EPSILON"],
+                                                     edges_cache=edges_cache)
+            ids = [n for n in scores if n not in seeds]
+            ranker.add(source, weight, [{"id": n} for n in ids], [scores[n] for n in ids])
+            for n in dangling:
+                frontier[n] = frontier.get(n, 0.0) + weight * scores.get(n, 0.0)
+    finally:
+        conn.close()
+
+    # grow the graph towards where the walks ended up
+    expand = sorted((n for n in frontier if n not in seeds), key=frontier.get, reverse=True)
+    refresher.enqueue(expand[:cfg["GRAPH_EXPAND"]])
+    return unavailable
 
 # -------------------------------------------------------------------------
 # WATCHLIST (SQLITE) + FEEDBACK
 # -------------------------------------------------------------------------
-def get_db_connection():
-    return sqlite3.connect("watchlist.db")
+def get_user_id():
+    """
+    Identity for the watchlist routes: the X-User-Id header, else a
+    `userId` query/body field, else the configured DEFAULT_USER.
+    """
+    user_id = request.headers.get("X-User-Id") or request.args.get("userId")
+    if not user_id and request.is_json:
+        user_id = (request.get_json(silent=True) or {}).get("userId")
+    user_id = str(user_id).strip() if user_id else ""
+    return user_id or current_app.config["DEFAULT_USER"]
+
+def get_db_connection(user_id):
+    """Connection to the shard holding `user_id`'s watchlist."""
+    return current_app.extensions["store"].connect(user_id)
 
-@app.route('/api/watchlist', methods=['GET'])
+@bp.route('/api/watchlist', methods=['GET'])
+@admit("local")
 def get_watchlist():
     """
     GET /api/watchlist => {"watchlist":[ {movie_id,favourite,rating}, ...]}
     """
+    user_id = get_user_id()
     try:
-        conn = get_db_connection()
+        conn = get_db_connection(user_id)
         conn.row_factory = sqlite3.Row
         c = conn.cursor()
-        c.execute("SELECT movie_id, favourite, rating, feedback FROM watchlist")
-        rows = c.fetchall()
+        c.execute("SELECT movie_id, favourite, rating, feedback FROM watchlist WHERE user_id = ?",
+                  (user_id,))
+        rows = [dict(r) for r in c.fetchall()]
         conn.close()
 
+        queue = get_write_behind()
+        if queue:
+            queue.overlay(user_id, rows)
+
         watchlist_data = []
         for r in rows:
             watchlist_data.append({
@@ -322,49 +722,57 @@ def get_watchlist():
         print(f"GET /api/watchlist DB error: {db_err}")
         return jsonify({"error": "Database error reading watchlist"}), 500
 
-@app.route('/api/watchlist', methods=['POST'])
+@bp.route('/api/watchlist', methods=['POST'])
+@admit("local")
 def add_to_watchlist():
     """
     POST /api/watchlist
     Body: {movieId: <int>}
     """
     data = request.json
+    user_id = get_user_id()
     movie_id = data.get("movieId")
     if not movie_id:
         return jsonify({"error": "movieId is required"}), 400
 
     try:
-        conn = get_db_connection()
+        conn = get_db_connection(user_id)
         c = conn.cursor()
-        c.execute("INSERT INTO watchlist (movie_id) VALUES (?)", (movie_id,))
+        c.execute("INSERT INTO watchlist (user_id, movie_id) VALUES (?, ?)", (user_id, movie_id))
         conn.commit()
         conn.close()
         return jsonify({"message": f"Movie {movie_id} added to watchlist!"})
     except sqlite3.IntegrityError:
         return jsonify({"message": f"Movie {movie_id} is already in the watchlist."})
 
-@app.route('/api/watchlist', methods=['DELETE'])
+@bp.route('/api/watchlist', methods=['DELETE'])
+@admit("local")
 def remove_from_watchlist():
     """
     DELETE /api/watchlist
     Body: {movieId: <int>}
     """
     data = request.json
+    user_id = get_user_id()
     movie_id = data.get("movieId")
     if not movie_id:
         return jsonify({"error": "movieId is required"}), 400
 
     try:
-        conn = get_db_connection()
+        conn = get_db_connection(user_id)
         c = conn.cursor()
-        c.execute("DELETE FROM watchlist WHERE movie_id = ?", (movie_id,))
+        c.execute("DELETE FROM watchlist WHERE user_id = ? AND movie_id = ?", (user_id, movie_id))
         conn.commit()
         conn.close()
+        queue = get_write_behind()
+        if queue:
+            queue.discard(user_id, movie_id)
         return jsonify({"message": f"Movie {movie_id} removed from watchlist!"})
     except sqlite3.Error as db_err:
         return jsonify({"error": str(db_err)}), 500
 
-@app.route('/api/watchlist/favourite', methods=['PUT'])
+@bp.route('/api/watchlist/favourite', methods=['PUT'])
+@admit("local")
 def toggle_favourite():
     """
     PUT /api/watchlist/favourite
@@ -372,22 +780,25 @@ def toggle_favourite():
     Toggles the favourite column.
     """
     data = request.json
+    user_id = get_user_id()
     movie_id = data.get("movieId")
     if not movie_id:
         return jsonify({"error": "movieId is required"}), 400
 
     try:
-        conn = get_db_connection()
+        conn = get_db_connection(user_id)
         conn.row_factory = sqlite3.Row
         c = conn.cursor()
-        c.execute("SELECT favourite FROM watchlist WHERE movie_id = ?", (movie_id,))
+        c.execute("SELECT favourite FROM watchlist WHERE user_id = ? AND movie_id = ?",
+                  (user_id, movie_id))
         row = c.fetchone()
         if not row:
             conn.close()
             return jsonify({"error": "Movie not found in watchlist"}), 404
 
         new_status = 1 if row["favourite"] == 0 else 0
-        c.execute("UPDATE watchlist SET favourite = ? WHERE movie_id = ?", (new_status, movie_id))
+        c.execute("UPDATE watchlist SET favourite = ? WHERE user_id = ? AND movie_id = ?",
+                  (new_status, user_id, movie_id))
         conn.commit()
         conn.close()
 
@@ -399,31 +810,41 @@ def toggle_favourite():
     except sqlite3.Error as db_err:
         return jsonify({"error": str(db_err)}), 500
 
-@app.route('/api/watchlist/rating', methods=['PUT'])
+@bp.route('/api/watchlist/rating', methods=['PUT'])
+@admit("local")
 def update_movie_rating():
     """
     PUT /api/watchlist/rating
     Body: {movieId: <int>, rating: <int> (0..5?)}
     """
     data = request.json
+    user_id = get_user_id()
     movie_id = data.get("movieId")
     rating = data.get("rating")
     if movie_id is None or rating is None:
         return jsonify({"error": "movieId and rating are required"}), 400
 
     try:
-        conn = get_db_connection()
+        conn = get_db_connection(user_id)
         conn.row_factory = sqlite3.Row
         c = conn.cursor()
-        c.execute("SELECT movie_id FROM watchlist WHERE movie_id = ?", (movie_id,))
+        c.execute("SELECT movie_id FROM watchlist WHERE user_id = ? AND movie_id = ?",
+                  (user_id, movie_id))
         row = c.fetchone()
         if not row:
             conn.close()
             return jsonify({"error": "Movie not found in watchlist"}), 404
 
-        c.execute("UPDATE watchlist SET rating = ? WHERE movie_id = ?", (rating, movie_id))
-        conn.commit()
-        conn.close()
+        queue = get_write_behind()
+        if queue:
+            # acknowledged now, committed by the next batched flush
+            conn.close()
+            queue.put(user_id, row["movie_id"], "rating", rating)
+        else:
+            c.execute("UPDATE watchlist SET rating = ? WHERE user_id = ? AND movie_id = ?",
+                      (rating, user_id, movie_id))
+            conn.commit()
+            conn.close()
 
         return jsonify({
             "message": f"Rating for movie {movie_id} updated to {rating}.",
@@ -432,7 +853,8 @@ def update_movie_rating():
     except sqlite3.Error as db_err:
         return jsonify({"error": str(db_err)}), 500
 
-@app.route('/api/watchlist/feedback', methods=['PUT'])
+@bp.route('/api/watchlist/feedback', methods=['PUT'])
+@admit("local")
 def update_feedback():
     """
     PUT /api/watchlist/feedback
@@ -440,24 +862,33 @@ def update_feedback():
     e.g. "like", "not_interested", "rated_3"
     """
     data = request.json
+    user_id = get_user_id()
     movie_id = data.get("movieId")
     feedback = data.get("feedback")
     if not movie_id or not feedback:
         return jsonify({"error": "movieId and feedback are required"}), 400
 
     try:
-        conn = get_db_connection()
+        conn = get_db_connection(user_id)
         conn.row_factory = sqlite3.Row
         c = conn.cursor()
-        c.execute("SELECT movie_id FROM watchlist WHERE movie_id = ?", (movie_id,))
+        c.execute("SELECT movie_id FROM watchlist WHERE user_id = ? AND movie_id = ?",
+                  (user_id, movie_id))
         row = c.fetchone()
         if not row:
             conn.close()
             return jsonify({"error": "Movie not found in watchlist"}), 404
 
-        c.execute("UPDATE watchlist SET feedback = ? WHERE movie_id = ?", (feedback, movie_id))
-        conn.commit()
-        conn.close()
+        queue = get_write_behind()
+        if queue:
+            # acknowledged now, committed by the next batched flush
+            conn.close()
+            queue.put(user_id, row["movie_id"], "feedback", feedback)
+        else:
+            c.execute("UPDATE watchlist SET feedback = ? WHERE user_id = ? AND movie_id = ?",
+                      (feedback, user_id, movie_id))
+            conn.commit()
+            conn.close()
 
         return jsonify({
             "message": f"Feedback for movie {movie_id} updated to {feedback}.",
@@ -466,11 +897,225 @@ def update_feedback():
     except sqlite3.Error as db_err:
         return jsonify({"error": str(db_err)}), 500
 
+# -------------------------------------------------------------------------
+# WATCHLIST EXPORT / IMPORT (streaming)
+# -------------------------------------------------------------------------
+def _transfer_format(default="ndjson"):
+    """`format` query arg, else inferred from the Content-Type, else `default`."""
+    fmt = request.args.get("format")
+    if not fmt:
+        mimetype = request.mimetype or ""
+        fmt = next((k for k, v in transfer.FORMATS.items() if v == mimetype), default)
+    return fmt if fmt in transfer.FORMATS else None
+
+@bp.route('/api/watchlist/export', methods=['GET'])
+@admit("local")
+def export_watchlist():
+    """
+    GET /api/watchlist/export?format=ndjson|csv
+    Streams the user's watchlist straight from a DB cursor.
+    X-Total-Count carries the row count so clients can show progress.
+    """
+    fmt = _transfer_format()
+    if fmt is None:
+        return jsonify({"error": "format must be 'ndjson' or 'csv'"}), 400
+    user_id = get_user_id()
+
+    queue = get_write_behind()
+    if queue:
+        queue.flush()
+
+    conn = get_db_connection(user_id)
+    try:
+        total = conn.execute("SELECT COUNT(*) FROM watchlist WHERE user_id = ?",
+                             (user_id,)).fetchone()[0]
+    except sqlite3.Error as db_err:
+        conn.close()
+        print(f"GET /api/watchlist/export DB error: {db_err}")
+        return jsonify({"error": "Database error exporting watchlist"}), 500
+
+    batch_size = current_app.config["TRANSFER_BATCH_SIZE"]
+    dumps = current_app.json.dumps
+
+    def generate():
+        try:
+            rows = transfer.iter_rows(conn, user_id, batch_size)
+            if fmt == "csv":
+                yield from transfer.csv_lines(rows)
+            else:
+                yield from transfer.ndjson_lines(rows, dumps)
+        finally:
+            conn.close()
+
+    return Response(stream_with_context(generate()), mimetype=transfer.FORMATS[fmt], headers={
+        "X-Total-Count": str(total),
+        "Content-Disposition": f"attachment; filename=watchlist.{fmt}",
+    })
+
+@bp.route('/api/watchlist/import', methods=['POST'])
+@admit("local")
+def import_watchlist():
+    """
+    POST /api/watchlist/import?format=ndjson|csv
+     -> &progress=1   (stream NDJSON: one {imported, skipped, batches} line
+                       per committed batch, then the summary line)
+    Body: NDJSON lines or CSV (header: movie_id,favourite,rating,feedback).
+    Parsed incrementally from the request stream and upserted in batches
+    of TRANSFER_BATCH_SIZE. Returns {imported, skipped, batches, errors}.
+    """
+    fmt = _transfer_format()
+    if fmt is None:
+        return jsonify({"error": "format must be 'ndjson' or 'csv'"}), 400
+    user_id = get_user_id()
+
+    lines = transfer.iter_lines(request.stream)
+    if fmt == "csv":
+        records = transfer.parse_csv(lines)
+    else:
+        records = transfer.parse_ndjson(lines, current_app.json.loads)
+
+    def progress(imported):
+        print(f"[Import] user={user_id}: {imported} row(s) committed")
+
+    batch_size = current_app.config["TRANSFER_BATCH_SIZE"]
+    try:
+        # queued ratings/feedback must land first, or they would override the import
+        queue = get_write_behind()
+        if queue:
+            queue.flush()
+        conn = get_db_connection(user_id)
+        if request.args.get("progress") in ("1", "true"):
+            return _stream_import(conn, user_id, records, batch_size, progress)
+        try:
+            summary = transfer.import_records(conn, user_id, records, batch_size,
+                                              on_batch=progress)
+        finally:
+            conn.close()
+    except sqlite3.Error as db_err:
+        print(f"POST /api/watchlist/import DB error: {db_err}")
+        return jsonify({"error": "Database error importing watchlist"}), 500
+    return jsonify(summary)
+
+def _stream_import(conn, user_id, records, batch_size, progress):
+    """
+    import_watchlist with progress=1: NDJSON, one line per committed batch and
+    the summary last. The status is sent before the import runs, so a DB error
+    arrives as a final {"error": ...} line.
+    """
+    dumps = current_app.json.dumps
+
+    def generate():
+        try:
+            for report in transfer.iter_import(conn, user_id, records, batch_size):
+                if "errors" not in report:
+                    progress(report["imported"])
+                yield dumps(report) + "\n"
+        except sqlite3.Error as db_err:
+            print(f"POST /api/watchlist/import DB error: {db_err}")
+            yield dumps({"error": "Database error importing watchlist"}) + "\n"
+        finally:
+            conn.close()
+
+    return Response(stream_with_context(generate()), mimetype=transfer.FORMATS["ndjson"])
+
+# -------------------------------------------------------------------------
+# CLI: MAINTENANCE (shards, graph, plot index, assets, shared cache)
+# -------------------------------------------------------------------------
+@bp.cli.command("rebalance-shards")
+@click.option("--from-shards", type=int, required=True,
+              help="Shard count the data is currently laid out for.")
+def rebalance_shards_command(from_shards):
+    """
+    Moves watchlists from a `--from-shards` layout to the configured
+    DATABASE_SHARDS layout. Stop writers (or run before deploy) first.
+    """
+    cfg = current_app.config
+    old_paths = db.shard_paths(cfg["DATABASE"], from_shards)
+    new_paths = db.shard_paths(cfg["DATABASE"], cfg["DATABASE_SHARDS"])
+    moved = db.rebalance(old_paths, new_paths)
+    click.echo(f"[DB] Rebalanced {from_shards} -> {cfg['DATABASE_SHARDS']} shard(s): "
+               f"moved {moved['users']} user(s), {moved['rows']} row(s).")
+
+@bp.cli.command("graph-refresh")
+@click.option("--limit", type=int, default=100, show_default=True,
+              help="Maximum number of movies to refresh.")
+def graph_refresh_command(limit):
+    """
+    Refreshes similar-movie edges for the movies whose edges are oldest
+    (never-fetched first) or older than GRAPH_MAX_AGE.
+    """
+    catalog = current_app.extensions["catalog"]
+    refresher = get_graph_refresher()
+    ids = catalog.stale_sources(current_app.config["GRAPH_MAX_AGE"], limit)
+    ok = sum(1 for mid in ids if refresher.refresh(mid))
+    click.echo(f"[Graph] Refreshed {ok}/{len(ids)} movie(s).")
+
+@bp.cli.command("plot-index")
+def plot_index_command():
+    """Rebuilds the plot search index from every overview in the catalog."""
+    count = get_plot_index().rebuild()
+    click.echo(f"[Plot] Indexed {count} overview(s) into {current_app.config['PLOT_INDEX']}.")
+
+@bp.cli.command("assets-build")
+def assets_build_command():
+    """
+    Minifies, fingerprints and precompresses the static JS/CSS into
+    STATIC_FOLDER/ASSET_DIR and rewrites its manifest.json.
+    """
+    report = assets.build(current_app.static_folder, current_app.config["ASSET_DIR"])
+    current_app.extensions.pop("asset_manifest", None)
+    for logical, built, size, minified, gz in report:
+        click.echo(f"[Assets] {logical} -> {built}  "
+                   f"{size / 1024:.1f} KiB -> {minified / 1024:.1f} KiB (gzip {gz / 1024:.1f} KiB)")
+    if assets.brotli is None:
+        click.echo("[Assets] brotli not installed; only .gz siblings were written.")
+
+def preload_shared_cache(app, limit=500):
+    """
+    Warms TMDB_SHARED_CACHE with the detail payloads (/movie/{id}, credits,
+    videos) of the `limit` most-linked catalog movies. Call it in the server
+    master before workers fork, e.g. from a gunicorn hook:
+
+        def on_starting(server):
+            preload_shared_cache(server.app.wsgi(), limit=500)
+
+    Returns (movies warmed, movies tried).
+    """
+    if "shared_cache" not in app.extensions:
+        return 0, 0
+    with app.app_context():
+        tmdb = get_tmdb()
+        ids = app.extensions["catalog"].popular(limit)
+        ok = 0
+        try:
+            for movie_id in ids:
+                try:
+                    for path in (f"/movie/{movie_id}", f"/movie/{movie_id}/credits",
+                                 f"/movie/{movie_id}/videos"):
+                        tmdb.get(path)
+                    ok += 1
+                except TMDbError as err:
+                    print(f"[Cache] Preload of movie {movie_id} failed: {err}")
+        finally:
+            # each worker builds its own client (HTTP session, breaker) after the fork
+            app.extensions.pop("tmdb", None)
+    print(f"[Cache] Preloaded {ok}/{len(ids)} movie(s) into {app.config['TMDB_SHARED_CACHE']}.")
+    return ok, len(ids)
+
+@bp.cli.command("cache-preload")
+@click.option("--limit", type=int, default=500, show_default=True,
+              help="Number of most-linked catalog movies to warm.")
+def cache_preload_command(limit):
+    """Warms the shared TMDb cache (TMDB_SHARED_CACHE) with popular movie details."""
+    if "shared_cache" not in current_app.extensions:
+        raise click.ClickException("TMDB_SHARED_CACHE is not configured.")
+    preload_shared_cache(current_app._get_current_object(), limit)
+
 # -------------------------------------------------------------------------
 # MAIN LAUNCH
 # -------------------------------------------------------------------------
 if __name__ == '__main__':
-    init_db()
+    app = create_app()
     print("[Flask] Registered Routes:")
     for rule in app.url_map.iter_rules():
         print(f"  {rule} -> {rule.methods}")
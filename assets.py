@@ -0,0 +1,262 @@
+"""
+assets.py
+Build step for the front-end's static JS/CSS:
+ - minify (a conservative, string/comment/regex-aware whitespace minifier;
+   newlines that may end a statement are kept, so ASI is never changed)
+ - fingerprint: <name>.<content hash><ext>, written under static/<ASSET_DIR>/
+ - precompress: .gz siblings always, .br siblings when `brotli` is installed
+ - manifest.json maps logical names ("js/movie-details.js") to built files
+
+Built files are never overwritten or deleted, so pages rendered before a
+deploy keep working; the manifest is replaced last, atomically.
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import re
+
+try:
+    import brotli
+except ImportError:  # optional: .br siblings are skipped without it
+    brotli = None
+
+MANIFEST = "manifest.json"
+EXTENSIONS = (".js", ".css")
+HASH_LENGTH = 12
+
+# -------------------------------------------------------------------------
+# MINIFIERS
+# -------------------------------------------------------------------------
+# Characters that may touch their neighbours without a space in between.
+_JS_TIGHT = set("{}()[];,:=?!&|<>")
+# After these (or at the start), "/" begins a regex literal, not a division.
+_JS_REGEX_AFTER = set("(,=:[!&|?{};+-*%<>~^")
+_JS_REGEX_KEYWORDS = ("return", "typeof", "case", "do", "else", "in", "of", "void")
+
+def _last_word(out):
+    i = len(out)
+    while i > 0 and (out[i - 1].isalnum() or out[i - 1] in "_$"):
+        i -= 1
+    return "".join(out[i:])
+
+def minify_js(src):
+    out = []          # output characters
+    pending = ""      # collapsed whitespace waiting for the next token: "", " " or "\n"
+    templates = []    # brace depth inside each open `${ ... }`
+    i, n = 0, len(src)
+
+    def emit(text):
+        nonlocal pending
+        if pending and out:
+            prev, nxt = out[-1], text[0]
+            if pending == "\n":
+                if prev not in "{[(,;:" and nxt not in "}])":
+                    out.append("\n")
+            elif prev not in _JS_TIGHT and nxt not in _JS_TIGHT:
+                out.append(" ")
+        pending = ""
+        out.extend(text)
+
+    def read_template(i):
+        """Copies template text from src[i] (just after ` or }) up to ` or ${."""
+        start = i
+        while i < n:
+            c = src[i]
+            if c == "\\":
+                i += 2
+            elif c == "`":
+                return src[start:i + 1], i + 1, False
+            elif c == "$" and src.startswith("${", i):
+                return src[start:i + 2], i + 2, True
+            else:
+                i += 1
+        raise ValueError("unterminated template literal")
+
+    while i < n:
+        c = src[i]
+        if c in " \t\r\n\f\v":
+            j = i
+            while j < n and src[j] in " \t\r\n\f\v":
+                j += 1
+            if "\n" in src[i:j] or pending == "\n":
+                pending = "\n"
+            elif not pending:
+                pending = " "
+            i = j
+        elif src.startswith("//", i):
+            j = src.find("\n", i)
+            i = n if j < 0 else j
+        elif src.startswith("/*", i):
+            j = src.find("*/", i + 2)
+            if j < 0:
+                raise ValueError("unterminated comment")
+            if "\n" in src[i:j]:
+                pending = "\n"
+            elif not pending:
+                pending = " "
+            i = j + 2
+        elif c in "'\"":
+            j = i + 1
+            while j < n and src[j] != c:
+                if src[j] == "\n":
+                    raise ValueError("unterminated string literal")
+                j += 2 if src[j] == "\\" else 1
+            emit(src[i:j + 1])
+            i = j + 1
+        elif c == "`":
+            text, i, opened = read_template(i + 1)
+            emit("`" + text)
+            if opened:
+                templates.append(0)
+        elif c == "{" and templates:
+            templates[-1] += 1
+            emit(c)
+            i += 1
+        elif c == "}" and templates and templates[-1] == 0:
+            templates.pop()
+            text, i, opened = read_template(i + 1)
+            emit("}" + text)
+            if opened:
+                templates.append(0)
+        elif c == "}" and templates:
+            templates[-1] -= 1
+            emit(c)
+            i += 1
+        elif c == "/" and (not out or out[-1] in _JS_REGEX_AFTER
+                           or _last_word(out) in _JS_REGEX_KEYWORDS):
+            j, in_class = i + 1, False
+            while j < n and (in_class or src[j] != "/"):
+                if src[j] == "\n":
+                    raise ValueError("unterminated regex literal")
+                if src[j] == "\\":
+                    j += 1
+                elif src[j] == "[":
+                    in_class = True
+                elif src[j] == "]":
+                    in_class = False
+                j += 1
+            j += 1
+            while j < n and (src[j].isalnum() or src[j] == "_"):
+                j += 1  # flags
+            emit(src[i:j])
+            i = j
+        else:
+            emit(c)
+            i += 1
+    return "".join(out).strip() + "\n"
+
+_CSS_TIGHT = set("{};,>")
+
+def minify_css(src):
+    out, pending = [], False
+    i, n = 0, len(src)
+    while i < n:
+        c = src[i]
+        if src.startswith("/*", i):
+            j = src.find("*/", i + 2)
+            i = n if j < 0 else j + 2
+            pending = True
+        elif c in " \t\r\n\f":
+            pending = True
+            i += 1
+        else:
+            if c in "'\"":
+                j = i + 1
+                while j < n and src[j] != c:
+                    j += 2 if src[j] == "\\" else 1
+                token = src[i:j + 1]
+                i = j + 1
+            else:
+                token = c
+                i += 1
+            if pending and out and out[-1] not in _CSS_TIGHT and token[0] not in _CSS_TIGHT:
+                out.append(" ")
+            pending = False
+            out.append(token)
+    return "".join(out).replace(";}", "}") + "\n"
+
+MINIFIERS = {".js": minify_js, ".css": minify_css}
+
+# -------------------------------------------------------------------------
+# BUILD
+# -------------------------------------------------------------------------
+def _write_once(path, data):
+    """Writes `data` unless `path` already exists (hashed names never change content)."""
+    if os.path.exists(path):
+        return
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+def build(static_folder, out_dir="dist"):
+    """
+    Minifies, fingerprints and precompresses every .js/.css file under
+    `static_folder` (except `out_dir`) into `static_folder/out_dir`.
+    Returns [(logical name, built name, original size, minified size, gzip size)].
+    """
+    target = os.path.join(static_folder, out_dir)
+    manifest, report = {}, []
+    for root, dirs, files in os.walk(static_folder):
+        if os.path.abspath(root) == os.path.abspath(static_folder) and out_dir in dirs:
+            dirs.remove(out_dir)
+        dirs.sort()
+        for name in sorted(files):
+            base, ext = os.path.splitext(name)
+            if ext not in EXTENSIONS:
+                continue
+            source = os.path.join(root, name)
+            logical = os.path.relpath(source, static_folder).replace(os.sep, "/")
+            with open(source, encoding="utf-8") as f:
+                original = f.read()
+            data = MINIFIERS[ext](original).encode("utf-8")
+
+            digest = hashlib.sha256(data).hexdigest()[:HASH_LENGTH]
+            built = f"{os.path.dirname(logical)}/{base}.{digest}{ext}".lstrip("/")
+            path = os.path.join(target, *built.split("/"))
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            _write_once(path, data)
+            gz = gzip.compress(data, 9, mtime=0)
+            _write_once(path + ".gz", gz)
+            if brotli is not None:
+                _write_once(path + ".br", brotli.compress(data))
+
+            manifest[logical] = built
+            report.append((logical, built, len(original.encode("utf-8")), len(data), len(gz)))
+
+    os.makedirs(target, exist_ok=True)
+    tmp = os.path.join(target, f"{MANIFEST}.{os.getpid()}.tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(tmp, os.path.join(target, MANIFEST))
+    return report
+
+_BUILT_NAME = re.compile(r"\.[0-9a-f]{%d}(%s)$" % (HASH_LENGTH, "|".join(map(re.escape, EXTENSIONS))))
+
+def is_built(filename):
+    """
+    True for fingerprinted names (<name>.<hash><ext>), the only files safe to
+    cache forever; excludes the manifest and temp files. Names from earlier
+    builds still qualify, so pages rendered before a deploy keep working.
+    """
+    return _BUILT_NAME.search(filename) is not None
+
+def load_manifest(static_folder, out_dir="dist"):
+    """{logical name: built name}, or {} when no build has been run."""
+    try:
+        with open(os.path.join(static_folder, out_dir, MANIFEST), encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+def precompressed(folder, filename, accept_encodings):
+    """
+    (file to send, Content-Encoding or None) for `filename` in `folder`,
+    preferring a .br then .gz sibling the client accepts.
+    """
+    for encoding, suffix in (("br", ".br"), ("gzip", ".gz")):
+        if accept_encodings[encoding] and os.path.isfile(os.path.join(folder, filename + suffix)):
+            return filename + suffix, encoding
+    return filename, None
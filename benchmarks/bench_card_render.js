@@ -0,0 +1,299 @@
+/*
+ bench_card_render.js
+ Browser-free benchmark of the front-end card renderer (renderList() and
+ buildMovieCard() in static/js/movie-details.js).
+
+ Loads movie-details.js into a Node vm context backed by a minimal DOM shim
+ (elements, text, fragments, <template>; the card templates are parsed from
+ templates/movie.html), then renders N search results and reports:
+   - time to the first committed window and to a full scroll-through
+   - live-DOM insertions (appendChild / replaceChildren on attached nodes),
+     the operations that trigger style + layout work in a real browser
+ The previous per-card renderer (inline styles + innerHTML + one append per
+ card) is reproduced for comparison.
+
+ Usage:
+     node benchmarks/bench_card_render.js [items]
+*/
+
+"use strict";
+
+const fs = require("fs");
+const path = require("path");
+const vm = require("vm");
+
+const FRONTEND = path.join(__dirname, "..", "final-project-ninja-turtles-group-2-main");
+const VOID_TAGS = new Set(["br", "img", "input", "meta", "link", "hr"]);
+
+const stats = { liveInserts: 0, nodesCreated: 0 };
+
+/* ---------------------------------------------------------------- DOM shim */
+class FakeNode {
+  constructor() {
+    this.parentNode = null;
+    this.childNodes = [];
+    stats.nodesCreated++;
+  }
+  get isConnected() {
+    let n = this;
+    while (n.parentNode) n = n.parentNode;
+    return n === document.documentElement;
+  }
+  get firstElementChild() {
+    return this.childNodes.find(c => c instanceof FakeElement) || null;
+  }
+  appendChild(child) {
+    if (this.isConnected) stats.liveInserts++;
+    const moved = child instanceof FakeFragment ? child.childNodes.splice(0) : [child];
+    for (const c of moved) {
+      if (c.parentNode && c.parentNode !== this) c.remove();
+      c.parentNode = this;
+      this.childNodes.push(c);
+    }
+    return child;
+  }
+  replaceChildren(...nodes) {
+    this.childNodes.forEach(c => { c.parentNode = null; });
+    this.childNodes = [];
+    const connected = this.isConnected;
+    const count = stats.liveInserts;
+    nodes.forEach(n => this.appendChild(n));
+    if (connected) stats.liveInserts = count + 1;
+  }
+  remove() {
+    if (!this.parentNode) return;
+    const siblings = this.parentNode.childNodes;
+    siblings.splice(siblings.indexOf(this), 1);
+    this.parentNode = null;
+  }
+  get textContent() {
+    return this.childNodes.map(c => c.textContent).join("");
+  }
+  set textContent(value) {
+    this.childNodes.forEach(c => { c.parentNode = null; });
+    this.childNodes = [];
+    this.appendChild(new FakeText(String(value)));
+  }
+}
+
+class FakeText extends FakeNode {
+  constructor(data) { super(); this.data = data; }
+  get textContent() { return this.data; }
+  cloneNode() { return new FakeText(this.data); }
+}
+
+class FakeFragment extends FakeNode {
+  cloneNode(deep) {
+    const copy = new FakeFragment();
+    if (deep) this.childNodes.forEach(c => copy.appendChild(c.cloneNode(true)));
+    return copy;
+  }
+}
+
+class FakeClassList {
+  constructor(el) { this.el = el; }
+  get set() { return new Set((this.el.attributes.class || "").split(/\s+/).filter(Boolean)); }
+  write(set) { this.el.attributes.class = [...set].join(" "); }
+  add(...names) { const s = this.set; names.forEach(n => s.add(n)); this.write(s); }
+  remove(...names) { const s = this.set; names.forEach(n => s.delete(n)); this.write(s); }
+  toggle(name, force) {
+    const s = this.set;
+    const on = force === undefined ? !s.has(name) : !!force;
+    if (on) s.add(name); else s.delete(name);
+    this.write(s);
+    return on;
+  }
+  contains(name) { return this.set.has(name); }
+}
+
+class FakeElement extends FakeNode {
+  constructor(tag) {
+    super();
+    this.tagName = tag.toUpperCase();
+    this.attributes = {};
+    this.dataset = {};
+    this.style = {};
+    this.classList = new FakeClassList(this);
+    if (this.tagName === "TEMPLATE") this.content = new FakeFragment();
+  }
+  get id() { return this.attributes.id || ""; }
+  set id(value) { this.attributes.id = value; }
+  get className() { return this.attributes.class || ""; }
+  set className(value) { this.attributes.class = value; }
+  setAttribute(name, value) { this.attributes[name] = String(value); }
+  getAttribute(name) { return name in this.attributes ? this.attributes[name] : null; }
+  addEventListener() {}
+  set innerHTML(html) {
+    this.childNodes.forEach(c => { c.parentNode = null; });
+    this.childNodes = [];
+    parseHTML(html, this);
+  }
+  cloneNode(deep) {
+    const copy = new FakeElement(this.tagName);
+    Object.assign(copy.attributes, this.attributes);
+    Object.assign(copy.dataset, this.dataset);
+    if (deep) this.childNodes.forEach(c => copy.appendChild(c.cloneNode(true)));
+    if (this.content) copy.content = this.content.cloneNode(true);
+    return copy;
+  }
+  matches(selector) {
+    const m = /^\[([\w-]+)(?:="([^"]*)")?\]$/.exec(selector);
+    if (!m) throw new Error(`unsupported selector ${selector}`);
+    return m[2] === undefined ? m[1] in this.attributes : this.attributes[m[1]] === m[2];
+  }
+  querySelector(selector) {
+    for (const c of this.childNodes) {
+      if (!(c instanceof FakeElement)) continue;
+      if (c.matches(selector)) return c;
+      const found = c.querySelector(selector);
+      if (found) return found;
+    }
+    return null;
+  }
+}
+
+function parseHTML(html, parent) {
+  const token = /<!--[\s\S]*?-->|<(\/?)([a-zA-Z][\w-]*)([^>]*?)(\/?)>|([^<]+)/g;
+  const attr = /([^\s=]+)(?:\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s>]+)))?/g;
+  const stack = [parent];
+  let m;
+  while ((m = token.exec(html))) {
+    const top = stack[stack.length - 1];
+    const into = top.content || top;
+    if (m[5] !== undefined) {
+      into.appendChild(new FakeText(m[5]));
+    } else if (m[2] && m[1]) {
+      while (stack.length > 1 && stack.pop().tagName !== m[2].toUpperCase());
+    } else if (m[2]) {
+      const el = new FakeElement(m[2]);
+      let a;
+      while ((a = attr.exec(m[3]))) el.attributes[a[1]] = a[2] ?? a[3] ?? a[4] ?? "";
+      into.appendChild(el);
+      if (!m[4] && !VOID_TAGS.has(m[2].toLowerCase())) stack.push(el);
+    }
+  }
+}
+
+const document = {
+  documentElement: new FakeElement("html"),
+  createElement: tag => new FakeElement(tag),
+  createDocumentFragment: () => new FakeFragment(),
+  addEventListener() {},
+  getElementById(id) {
+    const walk = node => {
+      for (const c of node.childNodes) {
+        if (!(c instanceof FakeElement)) continue;
+        if (c.id === id) return c;
+        const found = walk(c);
+        if (found) return found;
+      }
+      return null;
+    };
+    return walk(this.documentElement);
+  }
+};
+
+// Windowed lists register here; scrollToEnd() plays their sentinels into view.
+const observers = [];
+class FakeIntersectionObserver {
+  constructor(callback) { this.callback = callback; this.targets = []; observers.push(this); }
+  observe(target) { this.targets.push(target); }
+  disconnect() { this.targets = []; }
+}
+function scrollToEnd() {
+  let fired = true;
+  while (fired) {
+    fired = false;
+    for (const o of observers) {
+      if (o.targets.length) {
+        o.callback(o.targets.map(target => ({ target, isIntersecting: true })));
+        fired = true;
+      }
+    }
+  }
+}
+
+/* ------------------------------------------------------------------ setup */
+const html = fs.readFileSync(path.join(FRONTEND, "templates", "movie.html"), "utf8");
+const templates = html.match(/<template[\s\S]*?<\/template>/g) || [];
+parseHTML(templates.join("\n"), document.documentElement);
+
+const context = vm.createContext({
+  document, console, IntersectionObserver: FakeIntersectionObserver,
+  window: { location: {} }, fetch: () => Promise.reject(new Error("offline"))
+});
+context.window.document = document;
+vm.runInContext(
+  fs.readFileSync(path.join(FRONTEND, "static", "js", "movie-details.js"), "utf8"),
+  context, { filename: "movie-details.js" });
+
+function makeItems(n) {
+  return Array.from({ length: n }, (_, i) => ({
+    id: 1000 + i,
+    title: `Movie <${i}> & Co`,
+    release_date: "1999-03-31",
+    rating: (i % 100) / 10,
+    poster_url: `https://image.tmdb.org/t/p/w500/poster${i}.jpg`
+  }));
+}
+
+// The renderer this benchmark replaces, as it was in movie-details.js.
+function legacyRender(container, results) {
+  container.innerHTML = "";
+  const flexWrap = document.createElement("div");
+  flexWrap.style.display = "flex";
+  flexWrap.style.flexWrap = "wrap";
+  flexWrap.style.gap = "10px";
+  container.appendChild(flexWrap);  // attached first, as when results stream in
+  results.forEach(item => {
+    const div = document.createElement("div");
+    div.style.width = "150px";
+    div.style.border = "1px solid #ccc";
+    div.style.borderRadius = "4px";
+    div.style.overflow = "hidden";
+    div.style.textAlign = "center";
+    div.innerHTML = `
+      <img src="${item.poster_url}" alt="${item.title}" width="150" />
+      <div style="padding:5px;">
+        <strong>${item.title}</strong><br>
+        (${item.release_date || "Unknown"})<br>
+        Rating: ${item.rating}<br><br>
+        <button onclick="window.location.href='/?id=${item.id}'">View Details</button>
+        <button onclick="addToWatchlist(${item.id})">Add to Watchlist</button>
+      </div>
+    `;
+    flexWrap.appendChild(div);
+  });
+}
+
+function measure(label, fn) {
+  const container = document.createElement("div");
+  document.documentElement.appendChild(container);
+  stats.liveInserts = 0;
+  stats.nodesCreated = 0;
+  const start = process.hrtime.bigint();
+  fn(container);
+  const first = Number(process.hrtime.bigint() - start) / 1e6;
+  const firstNodes = stats.nodesCreated;
+  scrollToEnd();
+  const total = Number(process.hrtime.bigint() - start) / 1e6;
+  console.log(`${label.padEnd(22)} first paint ${first.toFixed(2).padStart(8)} ms ` +
+              `(${String(firstNodes).padStart(7)} nodes)   all ${total.toFixed(2).padStart(8)} ms   ` +
+              `live inserts ${stats.liveInserts}`);
+  container.remove();
+}
+
+const count = parseInt(process.argv[2] || "2000", 10);
+const items = makeItems(count);
+for (let round = 0; round < 2; round++) {  // first round warms up the JIT
+  if (round) console.log(`${count} cards`);
+  const log = round ? measure : (label, fn) => { fn(document.createElement("div")); scrollToEnd(); };
+  log("legacy (per card)", c => legacyRender(c, items));
+  log("renderList", c => context.renderList(c, items, context.buildMovieCard, "movie-grid"));
+}
+
+// Sanity check: text is inserted as text, not markup.
+const probe = context.buildMovieCard(items[0]);
+if (probe.querySelector('[data-field="title"]').textContent !== items[0].title) {
+  throw new Error("card title not rendered");
+}
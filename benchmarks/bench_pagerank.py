@@ -0,0 +1,69 @@
+"""
+bench_pagerank.py
+Candidates and latency of graph recommendations vs. watchlist size.
+
+Builds a random similar-movie graph in a temporary catalog, then runs the
+combined personalized-PageRank walk (what /api/recommendations does) from
+watchlists of growing size. For each size it reports the candidates found,
+the walk time, and how many of the combined walk's top 20 are also in the
+top 20 of summed per-seed walks (the debug=1 path; up to 200 seeds).
+Fails if a watchlist yields no candidates.
+
+Usage:
+    python benchmarks/bench_pagerank.py [movies] [edges per movie]
+"""
+
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from catalog import CatalogStore, edge_weight  # noqa: E402
+from graph import personalized_pagerank  # noqa: E402
+
+SEED_COUNTS = (1, 20, 200, 1500)
+TOP = 20
+
+def top(scores, seeds):
+    ranked = sorted((n for n in scores if n not in seeds), key=scores.get, reverse=True)
+    return ranked[:TOP]
+
+def main():
+    movies = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    degree = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    rng = random.Random(7)
+    with tempfile.TemporaryDirectory() as tmp:
+        catalog = CatalogStore(os.path.join(tmp, "catalog.db"))
+        catalog.init()
+        conn = catalog.connect()
+        with conn:
+            conn.executemany(
+                "INSERT OR IGNORE INTO similar_edges (src, dst, weight) VALUES (?, ?, ?)",
+                ((src, rng.randrange(movies), edge_weight(rank))
+                 for src in range(movies) for rank in range(degree)))
+
+        for count in SEED_COUNTS:
+            seeds = {mid: 1.0 for mid in rng.sample(range(movies), count)}
+            start = time.perf_counter()
+            scores, _ = personalized_pagerank(conn, seeds, edges_cache={})
+            elapsed = (time.perf_counter() - start) * 1000
+            candidates = sum(1 for n in scores if n not in seeds)
+            if not candidates:
+                raise SystemExit(f"{count} seeds: no candidates")
+
+            overlap = "-"
+            if count <= 200:  # per-seed walks get slow beyond this
+                summed, cache = {}, {}
+                for mid in seeds:
+                    part, _ = personalized_pagerank(conn, {mid: 1.0}, edges_cache=cache)
+                    for n, s in part.items():
+                        summed[n] = summed.get(n, 0.0) + s
+                overlap = len(set(top(scores, seeds)) & set(top(summed, seeds)))
+            print(f"{count:5d} seeds  {candidates:6d} candidates  {elapsed:7.1f} ms   "
+                  f"top-{TOP} overlap with per-seed walks {overlap}/{TOP}")
+        conn.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+bench_plot_search.py
+Build time and query latency of the plot (overview) search index.
+
+Fills a temporary catalog with N generated overviews (Zipf-distributed
+vocabulary), builds the memory-mapped index, then times queries against
+the file alone and with a delta of freshly ingested overviews.
+
+Usage:
+    python benchmarks/bench_plot_search.py [movies]
+"""
+
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from catalog import CatalogStore  # noqa: E402
+from plotsearch import PlotIndex  # noqa: E402
+
+VOCAB = [f"w{i}" for i in range(20000)]
+WEIGHTS = [1.0 / (i + 1) for i in range(len(VOCAB))]
+QUERIES = ["w12 w480 w3051", "w7 w99", "w2500 w9000 w15000 w40", "w1 w2 w3 w4 w5"]
+
+def overviews(rng, count, start):
+    for i in range(count):
+        words = rng.choices(VOCAB, WEIGHTS, k=rng.randint(20, 60))
+        yield {"id": start + i, "title": f"Movie {start + i}", "overview": " ".join(words)}
+
+def time_queries(index, rounds=5):
+    timings = []
+    for _ in range(rounds):
+        for q in QUERIES:
+            start = time.perf_counter()
+            index.search(q, limit=20)
+            timings.append(time.perf_counter() - start)
+    timings.sort()
+    return timings[len(timings) // 2] * 1000, timings[-1] * 1000
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    rng = random.Random(42)
+    with tempfile.TemporaryDirectory() as tmp:
+        catalog = CatalogStore(os.path.join(tmp, "catalog.db"))
+        catalog.init()
+        conn = catalog.connect()
+        with conn:
+            catalog.upsert_movies(conn, overviews(rng, count, 1))
+        conn.close()
+
+        index = PlotIndex(catalog, os.path.join(tmp, "plot_index.bin"), rebuild_min=10 ** 9)
+        start = time.perf_counter()
+        index.rebuild()
+        size = os.path.getsize(index.path) / 2 ** 20
+        print(f"build  {count} overviews in {time.perf_counter() - start:6.2f}s ({size:.1f} MiB)")
+
+        median, worst = time_queries(index)
+        print(f"query  median {median:6.2f} ms   max {worst:6.2f} ms")
+
+        delta = count // 100
+        conn = catalog.connect()
+        with conn:
+            catalog.upsert_movies(conn, overviews(rng, delta, count + 1))
+        conn.close()
+        start = time.perf_counter()
+        index.refresh()
+        print(f"delta  {delta} new overviews folded in {(time.perf_counter() - start) * 1000:6.1f} ms")
+        median, worst = time_queries(index)
+        print(f"query  median {median:6.2f} ms   max {worst:6.2f} ms (with delta)")
+
+if __name__ == "__main__":
+    main()
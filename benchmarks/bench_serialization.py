@@ -0,0 +1,68 @@
+"""
+bench_serialization.py
+Payload size and serialization time for search-shaped responses.
+
+For 20 / 200 / 2000 results, compares the full payload against the grid
+projection (fields=id,title,poster_url,rating) under each available JSON
+provider (std always; orjson when installed).
+
+Usage:
+    python benchmarks/bench_serialization.py [repeats]
+"""
+
+import os
+import sys
+import tempfile
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from app import create_app  # noqa: E402
+from serialization import parse_fields, project  # noqa: E402
+
+GRID_FIELDS = parse_fields("id,title,poster_url,rating")
+
+def make_results(n):
+    return [{
+        "id": 100000 + i,
+        "title": f"Movie number {i}",
+        "overview": ("A retired cinematographer is pulled back into one last job "
+                     "when an old friend's film goes missing the night before "
+                     "its premiere. ") * 2,
+        "release_date": "2001-09-14",
+        "rating": 7.3,
+        "poster_url": f"https://image.tmdb.org/t/p/w500/poster{i:06d}.jpg",
+    } for i in range(n)]
+
+def providers():
+    names = ["std"]
+    try:
+        import orjson  # noqa: F401
+        names.append("orjson")
+    except ImportError:
+        print("(orjson not installed; only the std provider is measured)")
+    return names
+
+def main():
+    repeats = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    with tempfile.TemporaryDirectory() as tmp:
+        apps = {name: create_app({"DATABASE": os.path.join(tmp, "bench.db"),
+                                  "CATALOG_DATABASE": os.path.join(tmp, "catalog.db"),
+                                  "PLOT_INDEX": os.path.join(tmp, "plot_index.bin"),
+                                  "JSON_SERIALIZER": name})
+                for name in providers()}
+
+        print(f"{'items':>6} {'shape':<6} {'provider':<8} {'bytes':>9} {'us/response':>12}")
+        for n in (20, 200, 2000):
+            full = make_results(n)
+            shapes = {"full": full, "grid": [project(r, GRID_FIELDS) for r in full]}
+            for shape, results in shapes.items():
+                for name, app in apps.items():
+                    with app.app_context():
+                        body = app.json.response({"results": results}).get_data()
+                        reps = max(repeats * 20 // n, 5)
+                        secs = timeit.timeit(lambda: app.json.response({"results": results}),
+                                             number=reps)
+                    print(f"{n:>6} {shape:<6} {name:<8} {len(body):>9} {secs / reps * 1e6:>12.1f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+bench_shard_writes.py
+Write throughput vs. shard count.
+
+Several worker processes each hammer rating updates for their own users
+(one commit per update, like PUT /api/watchlist/rating). With one shard
+every commit queues behind the same SQLite write lock; with more shards,
+users on different files commit in parallel.
+
+Usage:
+    python benchmarks/bench_shard_writes.py [workers] [updates_per_worker]
+"""
+
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import db  # noqa: E402
+
+USERS_PER_WORKER = 8
+
+def _worker(args):
+    paths, worker, updates = args
+    store = db.ShardedStore(paths)
+    users = [f"user-{worker}-{u}" for u in range(USERS_PER_WORKER)]
+    conns = {u: store.connect(u) for u in users}
+    for i in range(updates):
+        user = users[i % len(users)]
+        conn = conns[user]
+        conn.execute("UPDATE watchlist SET rating = ? WHERE user_id = ? AND movie_id = ?",
+                     (i % 5 + 1, user, 1))
+        conn.commit()
+    for conn in conns.values():
+        conn.close()
+
+def run(shards, workers, updates):
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = db.shard_paths(os.path.join(tmp, "bench.db"), shards)
+        store = db.ShardedStore(paths)
+        for path in paths:
+            db.migrate(path)
+            conn = db.connect(path)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.close()
+        for w in range(workers):
+            for u in range(USERS_PER_WORKER):
+                user = f"user-{w}-{u}"
+                conn = store.connect(user)
+                with conn:
+                    conn.execute("INSERT INTO watchlist (user_id, movie_id) VALUES (?, 1)", (user,))
+                conn.close()
+
+        start = time.perf_counter()
+        with multiprocessing.Pool(workers) as pool:
+            pool.map(_worker, [(paths, w, updates) for w in range(workers)])
+        elapsed = time.perf_counter() - start
+    return workers * updates / elapsed
+
+def main():
+    workers = int(sys.argv[1]) if len(sys.argv) > 1 else 4
+    updates = int(sys.argv[2]) if len(sys.argv) > 2 else 500
+    print(f"{workers} writer processes x {updates} committed updates")
+    for shards in (1, 2, 4, 8):
+        print(f"  shards={shards:<2} {run(shards, workers, updates):10.0f} writes/s")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+bench_shared_cache.py
+Upstream fetches and cache hit ratio with per-worker caches vs. the shared
+cross-worker tier (sharedcache.py), plus shared-tier read/write latency.
+
+Forks W worker processes that each look up R Zipf-distributed movie
+payloads (a detail payload of ~4 KiB each). A miss stands in for a TMDb
+call and stores the payload. Reported per mode: upstream fetches across
+all workers and the overall hit ratio.
+
+Usage:
+    python benchmarks/bench_shared_cache.py [workers] [requests per worker]
+"""
+
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from resilience import ResponseCache, TieredCache  # noqa: E402
+from sharedcache import SharedCache  # noqa: E402
+
+MOVIES = 20000
+LOCAL_ENTRIES = 1024
+
+def payload(movie_id):
+    return {"id": movie_id, "title": f"Movie {movie_id}", "overview": "lorem ipsum " * 300,
+            "genres": [{"id": 18, "name": "Drama"}], "vote_average": 7.1}
+
+def worker(cache, seed, requests, out):
+    rng = random.Random(seed)
+    weights = [1.0 / (i + 1) for i in range(MOVIES)]
+    ids = rng.choices(range(MOVIES), weights, k=requests)
+    fetches = 0
+    for movie_id in ids:
+        key = (f"/movie/{movie_id}", ())
+        if cache.get(key) is None:
+            fetches += 1
+            cache.set(key, payload(movie_id), 200)
+    os.write(out, f"{fetches}\n".encode())
+
+def run(make_cache, workers, requests):
+    read, write = os.pipe()
+    pids = []
+    for w in range(workers):
+        pid = os.fork()
+        if pid == 0:
+            os.close(read)
+            worker(make_cache(), w, requests, write)
+            os._exit(0)
+        pids.append(pid)
+    os.close(write)
+    for pid in pids:
+        os.waitpid(pid, 0)
+    with os.fdopen(read) as f:
+        return sum(int(line) for line in f)
+
+def main():
+    workers = int(sys.argv[1]) if len(sys.argv) > 1 else 8
+    requests = int(sys.argv[2]) if len(sys.argv) > 2 else 20000
+    total = workers * requests
+    with tempfile.TemporaryDirectory() as tmp:
+        shared = SharedCache(os.path.join(tmp, "tmdb.cache"), size=128 * 2**20, slots=65536)
+        for label, make_cache in (
+                ("per-worker LRU", lambda: ResponseCache(LOCAL_ENTRIES)),
+                ("LRU + shared", lambda: TieredCache(ResponseCache(LOCAL_ENTRIES), shared))):
+            start = time.perf_counter()
+            fetches = run(make_cache, workers, requests)
+            print(f"{label:15} {workers} workers  upstream fetches {fetches:7d}   "
+                  f"hit ratio {1 - fetches / total:6.1%}   {time.perf_counter() - start:6.2f}s")
+
+        keys = [(f"/movie/{i}", ()) for i in range(2000)]
+        body = payload(1)
+        start = time.perf_counter()
+        for key in keys:
+            shared.set(key, body, 200)
+        write_us = (time.perf_counter() - start) / len(keys) * 1e6
+        start = time.perf_counter()
+        for key in keys:
+            shared.get(key)
+        read_us = (time.perf_counter() - start) / len(keys) * 1e6
+        print(f"shared tier     set {write_us:6.1f} us   get {read_us:6.1f} us   ({len(shared)} entries)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""
+bench_startup.py
+Cold-start benchmark: time from `import app` to the first served response.
+
+Each run is a fresh interpreter (like a newly spawned worker) that imports
+app.py, calls create_app() against temp databases, and serves GET
+/api/watchlist through the test client. The first run creates and migrates
+the database; later runs hit the "schema already current" fast path.
+
+Usage:
+    python benchmarks/bench_startup.py [runs]
+"""
+
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CHILD = r"""
+import json, sys, time
+t0 = time.perf_counter()
+import app
+t_import = time.perf_counter()
+flask_app = app.create_app({"DATABASE": sys.argv[1], "CATALOG_DATABASE": sys.argv[2],
+                             "TESTING": True})
+t_create = time.perf_counter()
+resp = flask_app.test_client().get("/api/watchlist")
+t_first = time.perf_counter()
+assert resp.status_code == 200, resp.status_code
+print(json.dumps({
+    "import_ms": (t_import - t0) * 1000,
+    "create_app_ms": (t_create - t_import) * 1000,
+    "first_response_ms": (t_first - t_create) * 1000,
+    "total_ms": (t_first - t0) * 1000,
+    "requests_loaded": "requests" in sys.modules,
+}))
+"""
+
+def run_once(db_path, catalog_path):
+    out = subprocess.run([sys.executable, "-c", CHILD, db_path, catalog_path],
+                         cwd=ROOT, capture_output=True, text=True, check=True)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+def main():
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "bench.db")
+        catalog_path = os.path.join(tmp, "catalog.db")
+        cold = run_once(db_path, catalog_path)
+        warm = [run_once(db_path, catalog_path) for _ in range(runs)]
+
+    print(f"first start (creates schema): {cold['total_ms']:.1f} ms")
+    print(f"warm starts over {runs} runs (median):")
+    for key in ("import_ms", "create_app_ms", "first_response_ms", "total_ms"):
+        print(f"  {key:<18} {statistics.median(r[key] for r in warm):8.1f}")
+    print(f"  requests imported before first TMDb call: {warm[-1]['requests_loaded']}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""
+bench_transfer.py
+Throughput of the streaming watchlist import / export endpoints.
+
+Imports N generated rows through POST /api/watchlist/import (NDJSON and
+CSV), then streams them back through GET /api/watchlist/export.
+
+Usage:
+    python benchmarks/bench_transfer.py [rows]
+"""
+
+import json
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from app import create_app  # noqa: E402
+
+def make_body(fmt, rows):
+    if fmt == "csv":
+        lines = ["movie_id,favourite,rating,feedback\n"]
+        lines += [f"{1000 + i},{i % 2},{i % 6},{'like' if i % 3 == 0 else ''}\n"
+                  for i in range(rows)]
+    else:
+        lines = [json.dumps({"movie_id": 1000 + i, "favourite": bool(i % 2),
+                             "rating": i % 6, "feedback": "like" if i % 3 == 0 else None}) + "\n"
+                 for i in range(rows)]
+    return "".join(lines).encode("utf-8")
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    with tempfile.TemporaryDirectory() as tmp:
+        app = create_app({"DATABASE": os.path.join(tmp, "bench.db"),
+                          "CATALOG_DATABASE": os.path.join(tmp, "catalog.db"),
+                          "PLOT_INDEX": os.path.join(tmp, "plot_index.bin")})
+        client = app.test_client()
+        for fmt in ("ndjson", "csv"):
+            user = f"bench-{fmt}"
+            body = make_body(fmt, rows)
+
+            start = time.perf_counter()
+            resp = client.post(f"/api/watchlist/import?format={fmt}", data=body,
+                               headers={"X-User-Id": user})
+            t_import = time.perf_counter() - start
+            assert resp.status_code == 200 and resp.json["imported"] == rows, resp.json
+
+            start = time.perf_counter()
+            resp = client.get(f"/api/watchlist/export?format={fmt}",
+                              headers={"X-User-Id": user}, buffered=False)
+            size = sum(len(chunk) for chunk in resp.response)
+            resp.close()
+            t_export = time.perf_counter() - start
+
+            print(f"{fmt:<6} import {rows / t_import:10.0f} rows/s   "
+                  f"export {rows / t_export:10.0f} rows/s ({size / 1024:.0f} KiB)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,322 @@
+"""
+catalog.py
+Local movie catalog (a SQLite file shared by all users):
+ - movies: the TMDb fields we render, one row per movie seen upstream
+ - similar_edges: weighted "similar movie" adjacency, one row per
+   (src, dst) from TMDb's /movie/{id}/similar, ranked by position
+
+`movies.edges_fetched_at` records when a movie's own /similar list was last
+stored (NULL = never), so edges can be refreshed incrementally by age.
+
+overview_log holds one row per movie whose overview was inserted or changed,
+keyed by an increasing `seq`, so the plot search index (plotsearch.py) can
+pick up new overviews incrementally. facet_log does the same for the faceted
+fields (release date, rating, genres) used by the facet index (facets.py).
+
+CatalogWriter stores movies seen in TMDb search results from a background
+thread, so requests never wait on the catalog's write lock.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+
+import db
+
+# -------------------------------------------------------------------------
+# MIGRATIONS
+# -------------------------------------------------------------------------
+def _create_catalog(conn):
+    """v1: movies + weighted similar-movie adjacency."""
+    conn.execute("""
+        CREATE TABLE movies (
+            movie_id INTEGER PRIMARY KEY,
+            title TEXT,
+            overview TEXT,
+            release_date TEXT,
+            vote_average REAL,
+            poster_path TEXT,
+            genre_ids TEXT,
+            edges_fetched_at REAL
+        )
+    """)
+    conn.execute("CREATE INDEX idx_movies_edges_fetched ON movies (edges_fetched_at)")
+    conn.execute("""
+        CREATE TABLE similar_edges (
+            src INTEGER NOT NULL,
+            dst INTEGER NOT NULL,
+            weight REAL NOT NULL,
+            PRIMARY KEY (src, dst)
+        ) WITHOUT ROWID
+    """)
+
+def _add_overview_log(conn):
+    """v2: change log of overviews, kept by triggers, for incremental indexing."""
+    conn.execute("""
+        CREATE TABLE overview_log (
+            seq INTEGER PRIMARY KEY AUTOINCREMENT,
+            movie_id INTEGER NOT NULL UNIQUE
+        )
+    """)
+    # Delete + insert (not INSERT OR REPLACE, which an outer upsert's conflict
+    # policy would override) so each movie appears once, at its latest seq.
+    conn.execute("""
+        CREATE TRIGGER movies_overview_insert AFTER INSERT ON movies
+        WHEN new.overview IS NOT NULL AND new.overview != ''
+        BEGIN
+            DELETE FROM overview_log WHERE movie_id = new.movie_id;
+            INSERT INTO overview_log (movie_id) VALUES (new.movie_id);
+        END
+    """)
+    conn.execute("""
+        CREATE TRIGGER movies_overview_update AFTER UPDATE OF overview ON movies
+        WHEN new.overview IS NOT old.overview
+        BEGIN
+            DELETE FROM overview_log WHERE movie_id = new.movie_id;
+            INSERT INTO overview_log (movie_id) VALUES (new.movie_id);
+        END
+    """)
+    conn.execute("""
+        INSERT INTO overview_log (movie_id)
+        SELECT movie_id FROM movies WHERE overview IS NOT NULL AND overview != ''
+    """)
+
+def _add_facet_log(conn):
+    """v3: change log of release_date / vote_average / genre_ids, for incremental facet counts."""
+    conn.execute("""
+        CREATE TABLE facet_log (
+            seq INTEGER PRIMARY KEY AUTOINCREMENT,
+            movie_id INTEGER NOT NULL UNIQUE
+        )
+    """)
+    conn.execute("""
+        CREATE TRIGGER movies_facets_insert AFTER INSERT ON movies
+        BEGIN
+            DELETE FROM facet_log WHERE movie_id = new.movie_id;
+            INSERT INTO facet_log (movie_id) VALUES (new.movie_id);
+        END
+    """)
+    conn.execute("""
+        CREATE TRIGGER movies_facets_update
+        AFTER UPDATE OF release_date, vote_average, genre_ids ON movies
+        WHEN new.release_date IS NOT old.release_date
+          OR new.vote_average IS NOT old.vote_average
+          OR new.genre_ids IS NOT old.genre_ids
+        BEGIN
+            DELETE FROM facet_log WHERE movie_id = new.movie_id;
+            INSERT INTO facet_log (movie_id) VALUES (new.movie_id);
+        END
+    """)
+    conn.execute("INSERT INTO facet_log (movie_id) SELECT movie_id FROM movies")
+
+MIGRATIONS = [
+    _create_catalog,
+    _add_overview_log,
+    _add_facet_log,
+]
+
+def edge_weight(rank):
+    """Weight of the rank-th (0-based) entry in a /similar list."""
+    return 1.0 / (1.0 + 0.25 * rank)
+
+class CatalogStore:
+    def __init__(self, path):
+        self.path = path
+
+    def init(self):
+        db.migrate(self.path, MIGRATIONS)
+        # shared by every worker, written by searches and the graph refresher:
+        # WAL keeps reads going during writes (persistent, so set it once)
+        conn = self.connect()
+        try:
+            if conn.execute("PRAGMA journal_mode").fetchone()[0] != "wal":
+                conn.execute("PRAGMA journal_mode=WAL")
+        finally:
+            conn.close()
+
+    def connect(self):
+        return db.connect(self.path)
+
+    # ---------------------------------------------------------------------
+    # Ingest
+    # ---------------------------------------------------------------------
+    def upsert_movies(self, conn, movies):
+        """Inserts / updates rendered fields for TMDb movie dicts (not edges_fetched_at)."""
+        conn.executemany("""
+            INSERT INTO movies (movie_id, title, overview, release_date,
+                                vote_average, poster_path, genre_ids)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT (movie_id) DO UPDATE SET
+                title = excluded.title,
+                overview = excluded.overview,
+                release_date = excluded.release_date,
+                vote_average = excluded.vote_average,
+                poster_path = excluded.poster_path,
+                genre_ids = excluded.genre_ids
+        """, [(
+            m["id"], m.get("title"), m.get("overview"), m.get("release_date"),
+            m.get("vote_average"), m.get("poster_path"),
+            json.dumps(m.get("genre_ids") or [g["id"] for g in m.get("genres", [])]),
+        ) for m in movies if m.get("id") is not None])
+
+    def ingest_similar(self, src_id, similar, now=None):
+        """
+        Replaces `src_id`'s outgoing edges with a fresh /similar result list
+        and stamps edges_fetched_at, in one transaction.
+        """
+        now = time.time() if now is None else now
+        similar = [m for m in similar if m.get("id") not in (None, src_id)]
+        conn = self.connect()
+        try:
+            with conn:
+                self.upsert_movies(conn, similar)
+                conn.execute("""
+                    INSERT INTO movies (movie_id, edges_fetched_at) VALUES (?, ?)
+                    ON CONFLICT (movie_id) DO UPDATE SET edges_fetched_at = excluded.edges_fetched_at
+                """, (src_id, now))
+                conn.execute("DELETE FROM similar_edges WHERE src = ?", (src_id,))
+                conn.executemany(
+                    "INSERT OR REPLACE INTO similar_edges (src, dst, weight) VALUES (?, ?, ?)",
+                    [(src_id, m["id"], edge_weight(rank)) for rank, m in enumerate(similar)])
+        finally:
+            conn.close()
+
+    # ---------------------------------------------------------------------
+    # Queries
+    # ---------------------------------------------------------------------
+    def fetched_at(self, movie_ids):
+        """{movie_id: edges_fetched_at or None} for the given ids."""
+        ids = list(movie_ids)
+        if not ids:
+            return {}
+        conn = self.connect()
+        try:
+            found = dict(conn.execute(
+                f"SELECT movie_id, edges_fetched_at FROM movies WHERE movie_id IN ({','.join('?' * len(ids))})",
+                ids).fetchall())
+        finally:
+            conn.close()
+        return {mid: found.get(mid) for mid in ids}
+
+    def stale_sources(self, max_age, limit, now=None):
+        """Movies whose edges were never fetched or are older than `max_age`, oldest first."""
+        now = time.time() if now is None else now
+        conn = self.connect()
+        try:
+            return [r[0] for r in conn.execute("""
+                SELECT movie_id FROM movies
+                WHERE edges_fetched_at IS NULL OR edges_fetched_at < ?
+                ORDER BY edges_fetched_at IS NOT NULL, edges_fetched_at
+                LIMIT ?
+            """, (now - max_age, limit))]
+        finally:
+            conn.close()
+
+    def popular(self, limit):
+        """Movie ids most often listed as similar to other movies, most-linked first."""
+        conn = self.connect()
+        try:
+            return [r[0] for r in conn.execute("""
+                SELECT dst FROM similar_edges
+                GROUP BY dst ORDER BY COUNT(*) DESC, dst
+                LIMIT ?
+            """, (limit,))]
+        finally:
+            conn.close()
+
+    def overview_seq(self, conn):
+        """Latest overview_log seq (0 when empty)."""
+        return conn.execute("SELECT COALESCE(MAX(seq), 0) FROM overview_log").fetchone()[0]
+
+    def overview_changes(self, since_seq):
+        """[(seq, movie_id, overview)] for overviews changed after `since_seq`, in seq order."""
+        conn = self.connect()
+        try:
+            return conn.execute("""
+                SELECT l.seq, l.movie_id, m.overview
+                FROM overview_log l JOIN movies m ON m.movie_id = l.movie_id
+                WHERE l.seq > ? ORDER BY l.seq
+            """, (since_seq,)).fetchall()
+        finally:
+            conn.close()
+
+    def facet_changes(self, since_seq):
+        """
+        [(seq, movie_id, release_date, vote_average, genre_ids)] for movies whose
+        faceted fields changed after `since_seq`, in seq order.
+        """
+        conn = self.connect()
+        try:
+            return conn.execute("""
+                SELECT l.seq, m.movie_id, m.release_date, m.vote_average, m.genre_ids
+                FROM facet_log l JOIN movies m ON m.movie_id = l.movie_id
+                WHERE l.seq > ? ORDER BY l.seq
+            """, (since_seq,)).fetchall()
+        finally:
+            conn.close()
+
+    def movies(self, movie_ids):
+        """{movie_id: TMDb-shaped dict} for the ids present in the catalog."""
+        ids = list(movie_ids)
+        if not ids:
+            return {}
+        conn = self.connect()
+        try:
+            rows = conn.execute(f"""
+                SELECT movie_id, title, overview, release_date, vote_average, poster_path, genre_ids
+                FROM movies WHERE movie_id IN ({','.join('?' * len(ids))})
+            """, ids).fetchall()
+        finally:
+            conn.close()
+        return {r[0]: {
+            "id": r[0], "title": r[1], "overview": r[2], "release_date": r[3],
+            "vote_average": r[4], "poster_path": r[5],
+            "genre_ids": json.loads(r[6]) if r[6] else [],
+        } for r in rows}
+
+class CatalogWriter:
+    """
+    Background writer for movies seen in TMDb results. put() only queues;
+    one thread per process upserts everything queued since its last write
+    in a single transaction (the latest dict per movie wins).
+    """
+    def __init__(self, catalog, max_pending=10000):
+        self.catalog = catalog
+        self.max_pending = max_pending
+        self._pending = {}   # movie_id -> TMDb movie dict
+        self._cond = threading.Condition()
+        self._pid = None
+
+    def put(self, movies):
+        with self._cond:
+            if self._pid != os.getpid():
+                # started on first use, so a forked worker gets its own thread
+                self._pid = os.getpid()
+                threading.Thread(target=self._run, name="catalog-writer", daemon=True).start()
+            for movie in movies:
+                mid = movie.get("id")
+                if mid is None:
+                    continue
+                if len(self._pending) >= self.max_pending and mid not in self._pending:
+                    print("[Catalog] writer backlog full; dropping search results")
+                    break
+                self._pending[mid] = movie
+            self._cond.notify()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._pending:
+                    self._cond.wait()
+                batch, self._pending = self._pending, {}
+            try:
+                conn = self.catalog.connect()
+                try:
+                    with conn:
+                        self.catalog.upsert_movies(conn, list(batch.values()))
+                finally:
+                    conn.close()
+            except sqlite3.Error as db_err:
+                print(f"[Catalog] could not store search results: {db_err}")
@@ -0,0 +1,222 @@
+"""
+db.py
+SQLite helpers for the CineMate watchlist ('Model'):
+ - Connection helper for a given database file
+ - Versioned schema migrations keyed on SQLite's PRAGMA user_version
+ - Per-user sharding of watchlists across several SQLite files
+
+Each migration is a small function that receives an open connection.
+Migrations run in order, once, inside a single write transaction; when the
+file is already at SCHEMA_VERSION the only work done is one PRAGMA read.
+"""
+
+import os
+import sqlite3
+import zlib
+
+# Owner of rows written before watchlists were per-user.
+DEFAULT_USER = "default"
+
+# -------------------------------------------------------------------------
+# MIGRATIONS
+# -------------------------------------------------------------------------
+def _create_watchlist(conn):
+    """v1: base watchlist table."""
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS watchlist (
+            movie_id INTEGER PRIMARY KEY,
+            favourite INTEGER DEFAULT 0,
+            rating INTEGER DEFAULT 0
+        )
+    """)
+
+def _add_feedback_column(conn):
+    """
+    v2: 'feedback' column.
+    Databases created before versioning may already have it, so check first.
+    """
+    columns = [row[1] for row in conn.execute("PRAGMA table_info(watchlist);")]
+    if "feedback" not in columns:
+        conn.execute("ALTER TABLE watchlist ADD COLUMN feedback TEXT DEFAULT NULL;")
+
+def _per_user_watchlist(conn):
+    """
+    v3: key the watchlist on (user_id, movie_id).
+    SQLite can't change a primary key in place, so rebuild the table.
+    WITHOUT ROWID clusters rows on the key, making it the covering
+    (user_id, movie_id) index; the feedback index also carries movie_id.
+    """
+    conn.execute("""
+        CREATE TABLE watchlist_v3 (
+            user_id TEXT NOT NULL,
+            movie_id INTEGER NOT NULL,
+            favourite INTEGER DEFAULT 0,
+            rating INTEGER DEFAULT 0,
+            feedback TEXT DEFAULT NULL,
+            PRIMARY KEY (user_id, movie_id)
+        ) WITHOUT ROWID
+    """)
+    conn.execute("""
+        INSERT INTO watchlist_v3 (user_id, movie_id, favourite, rating, feedback)
+        SELECT ?, movie_id, favourite, rating, feedback FROM watchlist
+    """, (DEFAULT_USER,))
+    conn.execute("DROP TABLE watchlist")
+    conn.execute("ALTER TABLE watchlist_v3 RENAME TO watchlist")
+    conn.execute("CREATE INDEX idx_watchlist_user_feedback ON watchlist (user_id, feedback)")
+
+# Append new steps here; never reorder or edit a released one.
+MIGRATIONS = [
+    _create_watchlist,
+    _add_feedback_column,
+    _per_user_watchlist,
+]
+SCHEMA_VERSION = len(MIGRATIONS)
+
+def connect(path):
+    """Opens a connection to the SQLite file at `path`."""
+    return sqlite3.connect(path)
+
+def schema_version(conn):
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+def migrate(path, migrations=None):
+    """
+    Brings the database at `path` up to date with `migrations`
+    (default: the watchlist MIGRATIONS; other stores pass their own list).
+    Returns the number of migrations applied (0 when already current).
+    """
+    if migrations is None:
+        migrations = MIGRATIONS
+    target = len(migrations)
+    conn = connect(path)
+    try:
+        if schema_version(conn) >= target:
+            return 0
+
+        # Take the write lock, then re-check: another worker may have
+        # migrated between our read and the lock.
+        conn.execute("BEGIN IMMEDIATE")
+        current = schema_version(conn)
+        if current >= target:
+            conn.rollback()
+            return 0
+        for step in migrations[current:]:
+            step(conn)
+        conn.execute(f"PRAGMA user_version = {target}")
+        conn.commit()
+        return target - current
+    except sqlite3.Error:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+def init_db(path):
+    """
+    Creates / upgrades the watchlist database at `path`.
+    Errors are logged rather than raised so the app can still serve TMDb routes.
+    """
+    try:
+        applied = migrate(path)
+        if applied:
+            print(f"[DB] Applied {applied} migration(s) to {path}; schema at v{SCHEMA_VERSION}.")
+            # WAL lets readers proceed during a shard's writes; the setting
+            # is persistent, so only switch it alongside a migration.
+            conn = connect(path)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.close()
+    except sqlite3.Error as db_err:
+        print(f"[DB] init_db error: {db_err}")
+
+# -------------------------------------------------------------------------
+# SHARDING
+# -------------------------------------------------------------------------
+def jump_hash(key, buckets):
+    """
+    Jump consistent hash (Lamping & Veach) of an int key into [0, buckets).
+    Growing from n to n+1 buckets moves only ~1/(n+1) of the keys.
+    """
+    b, j = -1, 0
+    while j < buckets:
+        b = j
+        key = (key * 2862933555777941757 + 1) & 0xFFFFFFFFFFFFFFFF
+        j = int((b + 1) * ((1 << 31) / ((key >> 33) + 1)))
+    return b
+
+def shard_paths(database, shards):
+    """
+    File names for `shards` shards of `database`.
+    A single shard is the database itself, so unsharded setups keep their file;
+    otherwise "watchlist.db" becomes "watchlist.0.db", "watchlist.1.db", ...
+    """
+    if shards <= 1:
+        return [database]
+    stem, ext = os.path.splitext(database)
+    return [f"{stem}.{i}{ext}" for i in range(shards)]
+
+class ShardedStore:
+    """
+    Routes each user's watchlist to one SQLite file, chosen by hashing user_id.
+    Each shard has its own write lock, so writes for users on different
+    shards never wait on each other.
+    """
+    def __init__(self, paths):
+        self.paths = list(paths)
+
+    def shard_index(self, user_id):
+        return jump_hash(zlib.crc32(str(user_id).encode("utf-8")), len(self.paths))
+
+    def path_for(self, user_id):
+        return self.paths[self.shard_index(user_id)]
+
+    def connect(self, user_id):
+        return connect(self.path_for(user_id))
+
+    def init(self):
+        for path in self.paths:
+            init_db(path)
+
+def rebalance(old_paths, new_paths):
+    """
+    Moves every user whose shard changes from the `old_paths` layout to the
+    `new_paths` layout. Rows are copied (INSERT OR REPLACE) and committed
+    before being deleted from the source, so an interrupted run can simply
+    be re-run. Returns {"users": n, "rows": n} moved.
+    """
+    new_store = ShardedStore(new_paths)
+    for path in new_store.paths:
+        migrate(path)
+
+    moved_users = moved_rows = 0
+    for src_path in old_paths:
+        if not os.path.exists(src_path):
+            continue
+        migrate(src_path)
+        src = connect(src_path)
+        try:
+            users = [r[0] for r in src.execute("SELECT DISTINCT user_id FROM watchlist")]
+            for user_id in users:
+                dst_path = new_store.path_for(user_id)
+                if os.path.abspath(dst_path) == os.path.abspath(src_path):
+                    continue
+                rows = src.execute("""
+                    SELECT user_id, movie_id, favourite, rating, feedback
+                    FROM watchlist WHERE user_id = ?
+                """, (user_id,)).fetchall()
+                dst = connect(dst_path)
+                try:
+                    with dst:
+                        dst.executemany("""
+                            INSERT OR REPLACE INTO watchlist
+                                (user_id, movie_id, favourite, rating, feedback)
+                            VALUES (?, ?, ?, ?, ?)
+                        """, rows)
+                finally:
+                    dst.close()
+                with src:
+                    src.execute("DELETE FROM watchlist WHERE user_id = ?", (user_id,))
+                moved_users += 1
+                moved_rows += len(rows)
+        finally:
+            src.close()
+    return {"users": moved_users, "rows": moved_rows}
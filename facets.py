@@ -0,0 +1,198 @@
+"""
+facets.py
+Facet counts for the advanced search filters, over the local catalog.
+
+Every catalog movie gets a bit position; for each facet value (genre id,
+release year, rating in 0.1 steps) a bitmap - a Python int - has the bits
+of the movies with that value. A filter set is the AND of the bitmaps for
+its filters, and a facet count is the popcount of (facet value bitmap AND
+filter bitmap), so a whole facet response costs a few dozen big-int ANDs
+and popcounts no matter how large the catalog is.
+
+The bitmaps are built once from catalog.facet_log, then kept current by
+applying only the movies logged since (catalog triggers log every insert
+and every change to release_date / vote_average / genre_ids).
+"""
+
+import json
+import math
+import threading
+
+DECADE = 10
+RATING_BANDS = 10   # [0, 1), [1, 2), ... [9, 10]
+
+if hasattr(int, "bit_count"):
+    def _popcount(bitmap):
+        return bitmap.bit_count()
+else:  # Python < 3.10
+    def _popcount(bitmap):
+        return bin(bitmap).count("1")
+
+def year_of(release_date):
+    """Year of a TMDb "YYYY-MM-DD" date, or None."""
+    if release_date and len(release_date) >= 4 and release_date[:4].isdigit():
+        return int(release_date[:4])
+    return None
+
+def rating_step(vote_average):
+    """vote_average in 0.1 steps (7.46 -> 74), or None for unrated movies."""
+    if vote_average is None:
+        return None
+    try:
+        return min(100, max(0, int(math.floor(float(vote_average) * 10 + 1e-9))))
+    except (TypeError, ValueError):
+        return None
+
+def _genres(genre_ids):
+    if not genre_ids:
+        return ()
+    try:
+        return tuple(sorted({int(g) for g in json.loads(genre_ids)}))
+    except (TypeError, ValueError):
+        return ()
+
+class FacetIndex:
+    def __init__(self, catalog):
+        self.catalog = catalog
+        self._lock = threading.Lock()
+        self._seq = None
+        self._pos = {}        # movie_id -> bit position
+        self._values = []     # bit position -> (year, rating step, genres)
+        self.by_year = {}     # year -> bitmap
+        self.by_rating = {}   # rating step (0..100) -> bitmap
+        self.by_genre = {}    # genre id -> bitmap
+
+    # ---------------------------------------------------------------------
+    # Maintenance
+    # ---------------------------------------------------------------------
+    def refresh(self):
+        """Builds the bitmaps on first use, then applies catalog changes since."""
+        with self._lock:
+            if self._seq is None:
+                self._build(self.catalog.facet_changes(0))
+            else:
+                changes = self.catalog.facet_changes(self._seq)
+                for seq, mid, release_date, vote_average, genre_ids in changes:
+                    self._update(mid, (year_of(release_date), rating_step(vote_average),
+                                       _genres(genre_ids)))
+                    self._seq = seq
+
+    def _build(self, rows):
+        """Bulk load: set bits in bytearrays, then convert each once (linear time)."""
+        pos, values = {}, []
+        bits = ({}, {}, {})  # year, rating, genre -> bytearray
+        size = (len(rows) + 7) // 8
+
+        def mark(table, key, p):
+            if key not in table:
+                table[key] = bytearray(size)
+            table[key][p >> 3] |= 1 << (p & 7)
+
+        seq = 0
+        for seq, mid, release_date, vote_average, genre_ids in rows:
+            value = (year_of(release_date), rating_step(vote_average), _genres(genre_ids))
+            p = pos.setdefault(mid, len(values))
+            values.append(value)
+            if value[0] is not None:
+                mark(bits[0], value[0], p)
+            if value[1] is not None:
+                mark(bits[1], value[1], p)
+            for g in value[2]:
+                mark(bits[2], g, p)
+
+        def to_bitmaps(table):
+            return {k: int.from_bytes(b, "little") for k, b in table.items()}
+
+        self._pos, self._values = pos, values
+        self.by_year, self.by_rating, self.by_genre = map(to_bitmaps, bits)
+        self._seq = seq
+
+    def _update(self, mid, value):
+        p = self._pos.get(mid)
+        if p is None:
+            p = self._pos[mid] = len(self._values)
+            self._values.append((None, None, ()))
+        old = self._values[p]
+        if old == value:
+            return
+        bit = 1 << p
+        for table, before, after in ((self.by_year, old[0], value[0]),
+                                     (self.by_rating, old[1], value[1])):
+            if before != after:
+                if before is not None:
+                    table[before] &= ~bit
+                if after is not None:
+                    table[after] = table.get(after, 0) | bit
+        for g in set(old[2]) - set(value[2]):
+            self.by_genre[g] &= ~bit
+        for g in set(value[2]) - set(old[2]):
+            self.by_genre[g] = self.by_genre.get(g, 0) | bit
+        self._values[p] = value
+
+    # ---------------------------------------------------------------------
+    # Queries
+    # ---------------------------------------------------------------------
+    def counts(self, year=None, genres=(), any_genre=False, min_rating=None):
+        """
+        Counts for a filter set (the /discover filters):
+          year        exact release year
+          genres      genre ids; all must match, or any when `any_genre`
+          min_rating  minimum vote_average (compared in 0.1 steps)
+        Each facet is counted under the other facets' filters, so it shows
+        what changing that one filter would return.
+        """
+        self.refresh()
+        with self._lock:
+            everything = (1 << len(self._values)) - 1
+
+            genre_mask = everything
+            if genres:
+                maps = [self.by_genre.get(g, 0) for g in genres]
+                if any_genre:
+                    genre_mask = 0
+                    for bm in maps:
+                        genre_mask |= bm
+                else:
+                    for bm in maps:
+                        genre_mask &= bm
+            year_mask = self.by_year.get(year, 0) if year is not None else everything
+            rating_mask = everything
+            if min_rating is not None:
+                threshold = math.ceil(min_rating * 10 - 1e-9)
+                rating_mask = 0
+                for step, bm in self.by_rating.items():
+                    if step >= threshold:
+                        rating_mask |= bm
+
+            genre_ctx = year_mask & rating_mask
+            if genres and not any_genre:
+                genre_ctx &= genre_mask
+            genre_counts = sorted(
+                ({"id": g, "count": _popcount(bm & genre_ctx)} for g, bm in self.by_genre.items()),
+                key=lambda c: (-c["count"], c["id"]))
+
+            decades = {}
+            for y, bm in self.by_year.items():
+                decades[y - y % DECADE] = decades.get(y - y % DECADE, 0) | bm
+            year_ctx = genre_mask & rating_mask
+            year_counts = [{"from": d, "to": d + DECADE - 1, "count": _popcount(bm & year_ctx)}
+                           for d, bm in sorted(decades.items(), reverse=True)]
+
+            bands = [0] * RATING_BANDS
+            for step, bm in self.by_rating.items():
+                bands[min(step // 10, RATING_BANDS - 1)] |= bm
+            rating_ctx = genre_mask & year_mask
+            rating_counts, at_least = [], 0
+            for band in reversed(range(RATING_BANDS)):
+                count = _popcount(bands[band] & rating_ctx)
+                at_least += count
+                rating_counts.append({"min": band, "max": band + 1, "count": count,
+                                      "at_least": at_least})
+
+            return {
+                "total": _popcount(genre_mask & year_mask & rating_mask),
+                "catalog_size": len(self._values),
+                "genres": genre_counts,
+                "years": year_counts,
+                "ratings": rating_counts,
+            }
@@ -10,6 +10,141 @@
 
 let selectedRating = 0;
 
+/******************************************************************************
+ * 0) CARD RENDERING (shared by search, advanced search, recommendations and
+ *    the watchlist)
+ *   - cards are cloned from <template> elements in movie.html and filled with
+ *     textContent (no per-card innerHTML parsing or inline styles)
+ *   - a batch of cards is built in one DocumentFragment and committed to the
+ *     live DOM at once
+ *   - long lists are windowed: RENDER_CHUNK cards at a time, the next window
+ *     appended when a sentinel nears the viewport; cards also use CSS
+ *     content-visibility so off-screen ones skip layout and paint
+ *   - posters are lazy-loaded; buttons use one delegated click handler
+******************************************************************************/
+const RENDER_CHUNK = 40;
+const DETAIL_FETCH_CONCURRENCY = 6;
+
+const CARD_ACTIONS = {
+  details: id => { window.location.href = `/?id=${id}`; },
+  add: id => addToWatchlist(id),
+  remove: id => removeFromWatchlist(id),
+  favourite: id => toggleFavourite(id)
+};
+
+const templateCache = {};
+
+function cloneTemplate(templateId) {
+  let tpl = templateCache[templateId];
+  if (!tpl) {
+    tpl = templateCache[templateId] = document.getElementById(templateId);
+  }
+  return tpl.content.firstElementChild.cloneNode(true);
+}
+
+function setField(root, name, value) {
+  const el = root.querySelector(`[data-field="${name}"]`);
+  if (el) el.textContent = value;
+  return el;
+}
+
+function setPoster(root, src, title) {
+  const img = root.querySelector('[data-field="poster"]');
+  img.src = src || "https://via.placeholder.com/500x750?text=No+Image";
+  img.alt = title || "";
+}
+
+// Search / discover / recommendation result: {id, title, release_date, rating, poster_url}
+function buildMovieCard(item) {
+  const card = cloneTemplate("movie-card-template");
+  card.dataset.movieId = item.id;
+  setPoster(card, item.poster_url, item.title);
+  setField(card, "title", item.title);
+  setField(card, "release", item.release_date || "Unknown");
+  setField(card, "rating", item.rating);
+  return card;
+}
+
+// Watchlist entry {movie_id, favourite, rating} joined with its /api/movie detail
+function buildWatchlistRow(entry) {
+  const { w, detail } = entry;
+  const row = cloneTemplate("watchlist-row-template");
+  row.dataset.movieId = w.movie_id;
+  setPoster(row, detail["Poster URL"], detail.Title);
+  setField(row, "title", detail.Title);
+  setField(row, "release", detail["Release Date"]);
+  setField(row, "rating", detail.Rating);
+  setField(row, "user-rating", w.rating || 0);
+  const favBtn = setField(row, "favourite", w.favourite ? "Unfavourite" : "Mark as Favourite");
+  favBtn.id = `fav-btn-${w.movie_id}`;
+  favBtn.classList.toggle("favorite", !!w.favourite);
+  return row;
+}
+
+function onCardAction(event) {
+  const btn = event.target.closest("button[data-action]");
+  if (!btn) return;
+  const card = btn.closest("[data-movie-id]");
+  const action = CARD_ACTIONS[btn.dataset.action];
+  if (card && action) action(parseInt(card.dataset.movieId));
+}
+
+/**
+ * Replaces `container`'s content with `items` rendered by `build`, inside a
+ * <div class="listClass">. Returns that list element.
+ */
+function renderList(container, items, build, listClass) {
+  if (container.renderObserver) {
+    container.renderObserver.disconnect();
+    container.renderObserver = null;
+  }
+  const list = document.createElement("div");
+  list.className = listClass;
+  list.addEventListener("click", onCardAction);
+
+  const windowed = items.length > RENDER_CHUNK && typeof IntersectionObserver !== "undefined";
+  let next = 0;
+  const appendChunk = size => {
+    const frag = document.createDocumentFragment();
+    const end = Math.min(next + size, items.length);
+    for (; next < end; next++) frag.appendChild(build(items[next]));
+    list.appendChild(frag);
+  };
+  appendChunk(windowed ? RENDER_CHUNK : items.length);
+  container.replaceChildren(list);
+
+  if (windowed) {
+    const sentinel = document.createElement("div");
+    container.appendChild(sentinel);
+    const observer = new IntersectionObserver(entries => {
+      if (!entries.some(e => e.isIntersecting)) return;
+      appendChunk(RENDER_CHUNK);
+      if (next >= items.length) {
+        observer.disconnect();
+        sentinel.remove();
+        container.renderObserver = null;
+      }
+    }, { rootMargin: "800px 0px" });
+    observer.observe(sentinel);
+    container.renderObserver = observer;
+  }
+  return list;
+}
+
+// Runs `fn` over `items` with at most `limit` calls in flight; keeps order.
+async function mapLimit(items, limit, fn) {
+  const results = new Array(items.length);
+  let next = 0;
+  const worker = async () => {
+    while (next < items.length) {
+      const i = next++;
+      results[i] = await fn(items[i], i);
+    }
+  };
+  await Promise.all(Array.from({ length: Math.min(limit, items.length) }, worker));
+  return results;
+}
+
 // On page load
 document.addEventListener("DOMContentLoaded", function () {
   console.log("DOM loaded...");
@@ -27,7 +162,12 @@ document.addEventListener("DOMContentLoaded", function () {
   // 3) Load watchlist from local DB
   loadWatchlist();
 
-  // 4) Setup star rating
+  // 4) Live facet counts for the advanced search filters
+  ["adv-search-year", "adv-search-genre", "adv-search-minrating"].forEach(id => {
+    document.getElementById(id)?.addEventListener("input", scheduleFacetUpdate);
+  });
+
+  // 5) Setup star rating
   const stars = document.querySelectorAll(".star");
   stars.forEach(star => {
     star.addEventListener("click", () => {
@@ -55,10 +195,9 @@ function fetchTrendingMoviesWeek() {
         container.innerHTML = "<p>No trending data found for this week.</p>";
         return;
       }
-      data.results.forEach(movie => {
-        const card = createTrendCard(movie);
-        container.appendChild(card);
-      });
+      const frag = document.createDocumentFragment();
+      data.results.forEach(movie => frag.appendChild(createTrendCard(movie)));
+      container.appendChild(frag);
     })
     .catch(err => {
       console.error("Error loading trending week movies:", err);
@@ -79,7 +218,7 @@ function createTrendCard(movie) {
 
   card.innerHTML = `
     <div class="trend-poster">
-      <img src="${posterUrl}" alt="${displayTitle}" />
+      <img src="${posterUrl}" alt="${displayTitle}" loading="lazy" decoding="async" />
       <div class="score-badge">${userScore}</div>
     </div>
     <div class="trend-title">${displayTitle}</div>
@@ -94,7 +233,7 @@ function createTrendCard(movie) {
 /******************************************************************************
  * B) BASIC SEARCH & ADVANCED SEARCH
 ******************************************************************************/
-async function searchMovies() {
+async function searchMovies(mode) {
   const inputElem = document.getElementById("movie-name-input");
   if (!inputElem) {
     alert("Cannot find search input element!");
@@ -107,7 +246,8 @@ async function searchMovies() {
   }
 
   try {
-    const resp = await fetch(`/api/search?query=${encodeURIComponent(query)}`);
+    const modeParam = mode === "plot" ? "&mode=plot" : "";
+    const resp = await fetch(`/api/search?query=${encodeURIComponent(query)}${modeParam}`);
     if (!resp.ok) throw new Error("search fetch error");
 
     const data = await resp.json();
@@ -118,39 +258,11 @@ async function searchMovies() {
     if (section) section.classList.remove("hidden");
     if (!resultsBox) return;
 
-    resultsBox.innerHTML = "";
     if (!results.length) {
       resultsBox.innerHTML = "<p>No movies found!</p>";
       return;
     }
-
-    const flexWrap = document.createElement("div");
-    flexWrap.style.display = "flex";
-    flexWrap.style.flexWrap = "wrap";
-    flexWrap.style.gap = "10px";
-
-    results.forEach(item => {
-      const div = document.createElement("div");
-      div.style.width = "150px";
-      div.style.border = "1px solid #ccc";
-      div.style.borderRadius = "4px";
-      div.style.overflow = "hidden";
-      div.style.textAlign = "center";
-
-      div.innerHTML = `
-        <img src="${item.poster_url}" alt="${item.title}" width="150" />
-        <div style="padding:5px;">
-          <strong>${item.title}</strong><br>
-          (${item.release_date || "Unknown"})<br>
-          Rating: ${item.rating}<br><br>
-          <button onclick="window.location.href='/?id=${item.id}'">View Details</button>
-          <button onclick="addToWatchlist(${item.id})">Add to Watchlist</button>
-        </div>
-      `;
-      flexWrap.appendChild(div);
-    });
-
-    resultsBox.appendChild(flexWrap);
+    renderList(resultsBox, results, buildMovieCard, "movie-grid");
   } catch (err) {
     console.error("searchMovies error:", err);
     const resultsBox = document.getElementById("search-results-simple");
@@ -180,41 +292,12 @@ async function advancedSearch() {
     const advBox = document.getElementById("search-results-adv");
     if (!advBox) return;
 
-    advBox.innerHTML = "";
     const items = data.results || [];
     if (!items.length) {
       advBox.innerHTML = "<p>No advanced matches found.</p>";
       return;
     }
-
-    const flexBox = document.createElement("div");
-    flexBox.style.display = "flex";
-    flexBox.style.flexWrap = "wrap";
-    flexBox.style.gap = "10px";
-
-    items.forEach(one => {
-      const card = document.createElement("div");
-      card.style.width = "150px";
-      card.style.border = "1px solid #ccc";
-      card.style.borderRadius = "4px";
-      card.style.overflow = "hidden";
-      card.style.textAlign = "center";
-
-      card.innerHTML = `
-        <img src="${one.poster_url}" alt="${one.title}" width="150">
-        <div style="padding:5px;">
-          <strong>${one.title}</strong><br>
-          (${one.release_date || "Unknown"})<br>
-          Rating: ${one.rating}<br><br>
-          <button onclick="window.location.href='/?id=${one.id}'">View Details</button>
-          <button onclick="addToWatchlist(${one.id})">Add to Watchlist</button>
-        </div>
-      `;
-      flexBox.appendChild(card);
-    });
-
-    advBox.appendChild(flexBox);
-
+    renderList(advBox, items, buildMovieCard, "movie-grid");
   } catch (err) {
     console.error("advancedSearch error:", err);
     const advBox = document.getElementById("search-results-adv");
@@ -222,6 +305,48 @@ async function advancedSearch() {
   }
 }
 
+// Counts come from the local catalog (/api/facets), so they hint at which
+// filter combinations return anything before a /discover query is made.
+let facetTimer = null;
+let facetRequest = 0;
+
+function scheduleFacetUpdate() {
+  clearTimeout(facetTimer);
+  facetTimer = setTimeout(updateFacets, 250);
+}
+
+async function updateFacets() {
+  const hint = document.getElementById("adv-facets");
+  if (!hint) return;
+  const params = new URLSearchParams();
+  const yVal = document.getElementById("adv-search-year")?.value.trim();
+  const gVal = document.getElementById("adv-search-genre")?.value.trim();
+  const rVal = document.getElementById("adv-search-minrating")?.value.trim();
+  if (yVal) params.set("year", yVal);
+  if (gVal) params.set("genre", gVal);
+  if (rVal) params.set("minRating", rVal);
+
+  const requestId = ++facetRequest;
+  try {
+    const resp = await fetch(`/api/facets?${params}`);
+    if (requestId !== facetRequest) return;  // a newer update is on its way
+    if (!resp.ok) {
+      hint.textContent = "";
+      return;
+    }
+    const f = await resp.json();
+    const genres = f.genres.filter(g => g.count).slice(0, 5)
+      .map(g => `genre ${g.id}: ${g.count}`).join(", ");
+    const decades = f.years.filter(y => y.count).slice(0, 4)
+      .map(y => `${y.from}s: ${y.count}`).join(", ");
+    hint.textContent = `${f.total} of ${f.catalog_size} known movies match.` +
+      (genres ? ` Top genres - ${genres}.` : "") +
+      (decades ? ` By decade - ${decades}.` : "");
+  } catch (err) {
+    console.error("updateFacets error:", err);
+  }
+}
+
 /******************************************************************************
  * C) MOVIE DETAILS
 ******************************************************************************/
@@ -334,46 +459,26 @@ async function removeFromWatchlist(movieId) {
 async function loadWatchlist() {
   const container = document.getElementById("watchlist-container");
   if (!container) return;
-  container.innerHTML = "";
 
   try {
     const resp = await fetch("/api/watchlist");
     if (!resp.ok) throw new Error("loadWatchlist fetch error");
     const data = await resp.json();
 
+    // Details are fetched concurrently (only the fields shown, so the API
+    // skips cast/trailer lookups) and the list is rendered once.
     const items = data.watchlist || [];
-    for (let w of items) {
-      const detailResp = await fetch(`/api/movie/${w.movie_id}`);
-      if (!detailResp.ok) continue;
-      const detail = await detailResp.json();
-
-      const row = document.createElement("div");
-      row.style.display = "flex";
-      row.style.alignItems = "center";
-      row.style.gap = "10px";
-      row.style.border = "1px solid #ccc";
-      row.style.borderRadius = "4px";
-      row.style.marginBottom = "10px";
-
-      row.innerHTML = `
-        <img
-          src="${detail["Poster URL"]}"
-          alt="${detail.Title}"
-          style="width:60px; border-radius:4px;"
-        >
-        <div>
-          <strong>${detail.Title}</strong> (${detail["Release Date"]})<br>
-          TMDb Rating: ${detail.Rating}
-          <p>Your Rating: ${w.rating || 0}/5</p>
-          <button onclick="removeFromWatchlist(${w.movie_id})">Remove</button>
-          <button id="fav-btn-${w.movie_id}" onclick="toggleFavourite(${w.movie_id})">
-            ${w.favourite ? "Unfavourite" : "Mark as Favourite"}
-          </button>
-        </div>
-      `;
-      container.appendChild(row);
-      updateFavouriteButton(w.movie_id, w.favourite);
-    }
+    const entries = await mapLimit(items, DETAIL_FETCH_CONCURRENCY, async w => {
+      try {
+        const detailResp = await fetch(
+          `/api/movie/${w.movie_id}?fields=title,poster_url,release_date,rating`);
+        return detailResp.ok ? { w, detail: await detailResp.json() } : null;
+      } catch (err) {
+        console.error("loadWatchlist detail error:", err);
+        return null;
+      }
+    });
+    renderList(container, entries.filter(Boolean), buildWatchlistRow, "watchlist-list");
   } catch (err) {
     console.error("loadWatchlist error:", err);
     container.innerHTML = "<p>Failed to load watchlist.</p>";
@@ -479,46 +584,15 @@ async function fetchPersonalRecommendations() {
     const resp = await fetch("/api/recommendations");
     if (!resp.ok) throw new Error("recommendations fetch error");
     const data = await resp.json();
-    const recs = data.results || [];
+    const recs = data.recommendations || [];
 
     const container = document.getElementById("recommendations-container");
     if (!container) return;
-    container.innerHTML = "";
-
     if (!recs.length) {
       container.innerHTML = "<p>No personalized recommendations found.</p>";
       return;
     }
-
-    // style them like a small grid
-    const flexWrap = document.createElement("div");
-    flexWrap.style.display = "flex";
-    flexWrap.style.flexWrap = "wrap";
-    flexWrap.style.gap = "10px";
-
-    recs.forEach(r => {
-      const card = document.createElement("div");
-      card.style.width = "150px";
-      card.style.border = "1px solid #ccc";
-      card.style.borderRadius = "4px";
-      card.style.overflow = "hidden";
-      card.style.textAlign = "center";
-
-      card.innerHTML = `
-        <img src="${r.poster_url}" alt="${r.title}" width="150">
-        <div style="padding:5px;">
-          <strong>${r.title}</strong><br>
-          (${r.release_date || "Unknown"})<br>
-          Rating: ${r.rating}<br><br>
-          <button onclick="window.location.href='/?id=${r.id}'">View Details</button>
-          <button onclick="addToWatchlist(${r.id})">Add to Watchlist</button>
-        </div>
-      `;
-      flexWrap.appendChild(card);
-    });
-
-    container.appendChild(flexWrap);
-
+    renderList(container, recs, buildMovieCard, "movie-grid");
   } catch (err) {
     console.error("fetchPersonalRecommendations error:", err);
     const c = document.getElementById("recommendations-container");
@@ -0,0 +1,130 @@
+"""
+graph.py
+Multi-hop recommendations over the local similar-movie graph (catalog.py).
+
+personalized_pagerank() runs the "forward push" approximation of
+personalized PageRank from a set of weighted seed movies. It only touches
+nodes that receive a meaningful share of probability mass, so a walk over
+2-3 hops of the local graph takes milliseconds and never calls TMDb.
+
+GraphRefresher keeps the graph current in the background: it fetches
+/similar for movies whose edges are missing or older than `max_age`,
+one at a time, off the request path.
+"""
+
+import queue
+import threading
+import time
+from collections import deque
+
+def personalized_pagerank(conn, seeds, alpha=0.75, epsilon=1e-3, max_pushes=50000,
+                          edges_cache=None):
+    """
+    Approximate personalized PageRank.
+      conn         open connection to the catalog database
+      seeds        {movie_id: weight}; normalized to a probability vector
+      alpha        probability of following an edge (1 - alpha restarts at a seed)
+      epsilon      residual below which a node is not pushed, for a single
+                   seed (divided by the number of seeds)
+      max_pushes   work bound; the walk stops after this many pushes
+      edges_cache  optional dict shared across calls to reuse edge lookups
+    Returns (scores, frontier): scores is {movie_id: score}; frontier is
+    the set of visited movies with no stored edges (candidates to fetch).
+    """
+    total = sum(w for w in seeds.values() if w > 0)
+    if total <= 0:
+        return {}, set()
+    residual = {mid: w / total for mid, w in seeds.items() if w > 0}
+    scores = {}
+    frontier = set()
+    if edges_cache is None:
+        edges_cache = {}
+
+    def out_edges(node):
+        edges = edges_cache.get(node)
+        if edges is None:
+            edges = conn.execute("SELECT dst, weight FROM similar_edges WHERE src = ?",
+                                 (node,)).fetchall()
+            edges_cache[node] = edges
+        return edges
+
+    # The seed mass is split across the seeds, so the threshold is too: each
+    # seed's share is pushed as far as a single-seed walk would push it, and
+    # long watchlists still reach past their own seeds.
+    epsilon /= len(residual)
+    work = deque(residual)
+    pushes = 0
+    while work and pushes < max_pushes:
+        node = work.popleft()
+        r = residual.get(node, 0.0)
+        if r < epsilon:
+            continue
+        residual[node] = 0.0
+        pushes += 1
+        edges = out_edges(node)
+        if not edges:
+            # dangling: keep all of its mass
+            scores[node] = scores.get(node, 0.0) + r
+            frontier.add(node)
+            continue
+        scores[node] = scores.get(node, 0.0) + (1 - alpha) * r
+        spread = alpha * r / sum(w for _, w in edges)
+        for dst, w in edges:
+            before = residual.get(dst, 0.0)
+            after = before + spread * w
+            residual[dst] = after
+            if before < epsilon <= after:
+                work.append(dst)
+    return scores, frontier
+
+class GraphRefresher:
+    """
+    Background worker that refreshes movies' /similar edges.
+    `fetch_similar(movie_id)` returns a TMDb results list (or raises).
+    """
+    def __init__(self, catalog, fetch_similar, max_age=7 * 86400):
+        self.catalog = catalog
+        self.fetch_similar = fetch_similar
+        self.max_age = max_age
+        self._queue = queue.Queue()
+        self._queued = set()
+        self._lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, name="graph-refresh", daemon=True)
+        self._thread.start()
+
+    def refresh(self, movie_id):
+        """Fetches and stores one movie's edges now. Returns False on failure."""
+        try:
+            self.catalog.ingest_similar(movie_id, self.fetch_similar(movie_id))
+            return True
+        except Exception as e:  # keep the worker alive whatever upstream/DB does
+            print(f"[Graph] refresh of {movie_id} failed: {e}")
+            return False
+
+    def enqueue(self, movie_ids):
+        for mid in movie_ids:
+            with self._lock:
+                if mid in self._queued:
+                    continue
+                self._queued.add(mid)
+            self._queue.put(mid)
+
+    def needs_refresh(self, movie_ids, now=None):
+        """Split ids into (missing, stale) by their edges_fetched_at."""
+        now = time.time() if now is None else now
+        missing, stale = [], []
+        for mid, fetched in self.catalog.fetched_at(movie_ids).items():
+            if fetched is None:
+                missing.append(mid)
+            elif now - fetched > self.max_age:
+                stale.append(mid)
+        return missing, stale
+
+    def _run(self):
+        while True:
+            mid = self._queue.get()
+            try:
+                self.refresh(mid)
+            finally:
+                with self._lock:
+                    self._queued.discard(mid)
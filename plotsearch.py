@@ -0,0 +1,293 @@
+"""
+plotsearch.py
+"Search by description": TF-IDF cosine search over catalog overviews.
+
+The index is a sparse document-term matrix stored column-wise (an inverted
+index: one postings list of (doc, weight) per term) in a single file that
+is memory-mapped read-only, so every worker on a host shares the same
+pages and opening it costs only the vocabulary load. A query is one sparse
+matrix-vector product: the postings of each query term are accumulated
+into per-document scores, and the top-k is taken with a heap.
+
+Overviews ingested after the file was built (catalog.overview_log) are
+kept in a small in-memory delta that supersedes the file's rows for those
+movies. When the delta grows past `rebuild_min` docs or `rebuild_ratio`
+of the file, the file is rebuilt in the background and swapped in with an
+atomic rename; other workers notice the new file and remap it. A missing
+file is built in the background too; searches raise IndexNotReady until
+it is in place.
+
+File layout (host byte order; the index is a local cache, not an export):
+    header    magic, n_docs, n_terms, n_postings, terms_len, last_seq
+    doc_ids   uint32[n_docs]            movie id of each doc index
+    terms     utf-8, "\\n"-joined, sorted, padded to 4 bytes
+    offsets   uint32[n_terms + 1]       postings range of each term
+    idf       float32[n_terms]
+    docs      uint32[n_postings]        doc index of each posting
+    weights   float32[n_postings]       L2-normalized tf-idf weight
+"""
+
+import heapq
+import math
+import mmap
+import os
+import re
+import struct
+import threading
+from array import array
+from collections import Counter, defaultdict
+
+class IndexNotReady(Exception):
+    """The index file is still being built; retry shortly."""
+
+MAGIC = b"CMPLOT01"
+HEADER = struct.Struct("=8sIIIIq")
+
+_TOKEN_RE = re.compile(r"[^\W_]+")
+STOP_WORDS = frozenset("""
+    a about after all also an and any are as at be been before but by can
+    for from has have he her his how in into is it its just more most new
+    not of on one only or other out over she so some than that the their
+    them then there these they this through to up was were what when where
+    which while who will with would you your
+""".split())
+
+def tokenize(text):
+    """Lower-cased word tokens without stop words; a trailing plural 's' is dropped."""
+    tokens = []
+    for tok in _TOKEN_RE.findall(text.lower()):
+        if len(tok) < 2 or tok in STOP_WORDS:
+            continue
+        if len(tok) > 3 and tok.endswith("s") and not tok.endswith("ss"):
+            tok = tok[:-1]
+        tokens.append(tok)
+    return tokens
+
+def idf(n_docs, df):
+    return math.log((1 + n_docs) / (1 + df)) + 1.0
+
+def tfidf_vector(text, idf_of):
+    """{term: weight}, L2-normalized, for `text` with `idf_of(term)` weights."""
+    vec = {t: (1.0 + math.log(c)) * idf_of(t) for t, c in Counter(tokenize(text)).items()}
+    norm = math.sqrt(sum(w * w for w in vec.values()))
+    return {t: w / norm for t, w in vec.items()} if norm else {}
+
+def _pad4(n):
+    return (n + 3) & ~3
+
+# -------------------------------------------------------------------------
+# BUILD
+# -------------------------------------------------------------------------
+def build_index(catalog, path):
+    """
+    Writes the index for every overview in `catalog` to `path` (atomically
+    replacing any previous file). Returns the number of documents indexed.
+    """
+    conn = catalog.connect()
+    try:
+        conn.execute("BEGIN")  # one snapshot for the seq and the rows
+        last_seq = catalog.overview_seq(conn)
+        rows = conn.execute("""
+            SELECT movie_id, overview FROM movies
+            WHERE overview IS NOT NULL AND overview != ''
+            ORDER BY movie_id
+        """).fetchall()
+        conn.rollback()
+    finally:
+        conn.close()
+
+    docs = [(mid, Counter(tokenize(text))) for mid, text in rows]
+    df = Counter()
+    for _, counts in docs:
+        df.update(counts.keys())
+    n_docs = len(docs)
+    term_idf = {t: idf(n_docs, n) for t, n in df.items()}
+
+    postings = defaultdict(list)
+    for index, (_, counts) in enumerate(docs):
+        vec = {t: (1.0 + math.log(c)) * term_idf[t] for t, c in counts.items()}
+        norm = math.sqrt(sum(w * w for w in vec.values()))
+        for t, w in vec.items():
+            postings[t].append((index, w / norm))
+
+    terms = sorted(postings)
+    offsets, idfs = array("I"), array("f")
+    post_docs, post_weights = array("I"), array("f")
+    for t in terms:
+        offsets.append(len(post_docs))
+        idfs.append(term_idf[t])
+        for index, w in postings[t]:
+            post_docs.append(index)
+            post_weights.append(w)
+    offsets.append(len(post_docs))
+    blob = "\n".join(terms).encode("utf-8")
+
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(HEADER.pack(MAGIC, n_docs, len(terms), len(post_docs), len(blob), last_seq))
+        array("I", (mid for mid, _ in docs)).tofile(f)
+        f.write(blob + b"\0" * (_pad4(len(blob)) - len(blob)))
+        for arr in (offsets, idfs, post_docs, post_weights):
+            arr.tofile(f)
+    os.replace(tmp, path)
+    return n_docs
+
+# -------------------------------------------------------------------------
+# QUERY
+# -------------------------------------------------------------------------
+def _file_stamp(path):
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return (st.st_ino, st.st_mtime_ns, st.st_size)
+
+class _Segment:
+    """Read-only, memory-mapped view of an index file."""
+    def __init__(self, path):
+        with open(path, "rb") as f:
+            st = os.fstat(f.fileno())
+            self.stamp = (st.st_ino, st.st_mtime_ns, st.st_size)
+            buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, n_docs, n_terms, n_postings, terms_len, self.last_seq = HEADER.unpack_from(buf, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a plot index")
+        self.n_docs = n_docs
+        view = memoryview(buf)
+        pos = HEADER.size
+
+        def take(fmt, count):
+            nonlocal pos
+            part = view[pos:pos + 4 * count].cast(fmt)
+            pos += 4 * count
+            return part
+
+        self.doc_ids = take("I", n_docs)
+        blob = bytes(view[pos:pos + terms_len])
+        pos += _pad4(terms_len)
+        self.terms = {t: i for i, t in enumerate(blob.decode("utf-8").split("\n"))} if n_terms else {}
+        self.offsets = take("I", n_terms + 1)
+        self.idf = take("f", n_terms)
+        self.docs = take("I", n_postings)
+        self.weights = take("f", n_postings)
+
+    def idf_of(self, term):
+        i = self.terms.get(term)
+        return self.idf[i] if i is not None else idf(self.n_docs, 0)
+
+class _State:
+    """
+    A segment plus the overviews changed since it was built. Never mutated
+    once published: refresh() swaps in a new _State, so searches need no lock.
+    """
+    def __init__(self, segment, delta=None, inverted=None, seq=None):
+        self.segment = segment
+        self.delta = delta or {}        # movie_id -> {term: weight}
+        self.inverted = inverted or {}  # term -> {movie_id: weight}
+        self.seq = segment.last_seq if seq is None else seq
+
+    def apply(self, changes):
+        delta = dict(self.delta)
+        inverted = dict(self.inverted)
+        copied = set()
+
+        def postings(term):
+            if term not in copied:
+                inverted[term] = dict(inverted.get(term, ()))
+                copied.add(term)
+            return inverted[term]
+
+        for _, mid, text in changes:
+            for term in delta.get(mid, ()):
+                postings(term).pop(mid, None)
+            vec = tfidf_vector(text or "", self.segment.idf_of)
+            delta[mid] = vec
+            for term, w in vec.items():
+                postings(term)[mid] = w
+        return _State(self.segment, delta, inverted, changes[-1][0])
+
+class PlotIndex:
+    def __init__(self, catalog, path, rebuild_min=1000, rebuild_ratio=0.1):
+        self.catalog = catalog
+        self.path = path
+        self.rebuild_min = rebuild_min
+        self.rebuild_ratio = rebuild_ratio
+        self._state = None
+        self._lock = threading.Lock()
+        self._rebuilding = False
+
+    def refresh(self):
+        """
+        Remaps the file if another process rebuilt it, then folds in
+        overviews changed since. A missing file is built in the background;
+        until one has been mapped, raises IndexNotReady.
+        """
+        with self._lock:
+            stamp = _file_stamp(self.path)
+            state = self._state
+            if stamp is not None and (state is None or state.segment.stamp != stamp):
+                state = _State(_Segment(self.path))
+            if state is not None:
+                changes = self.catalog.overview_changes(state.seq)
+                if changes:
+                    state = state.apply(changes)
+                self._state = state
+        if stamp is None:
+            self._rebuild_async()
+            if state is None:
+                raise IndexNotReady(f"plot index {self.path} is being built")
+        elif len(state.delta) > max(self.rebuild_min, self.rebuild_ratio * state.segment.n_docs):
+            self._rebuild_async()
+        return state
+
+    def rebuild(self):
+        """Rebuilds the file from the whole catalog now. Returns the doc count."""
+        count = build_index(self.catalog, self.path)
+        self.refresh()
+        return count
+
+    def _rebuild_async(self):
+        with self._lock:
+            if self._rebuilding:
+                return
+            self._rebuilding = True
+
+        def run():
+            try:
+                count = build_index(self.catalog, self.path)
+                print(f"[Plot] Built index of {count} overview(s) at {self.path}")
+            except Exception as e:  # the previous file stays in service
+                print(f"[Plot] background rebuild failed: {e}")
+            finally:
+                with self._lock:
+                    self._rebuilding = False
+
+        threading.Thread(target=run, name="plot-rebuild", daemon=True).start()
+
+    def search(self, query, limit=20, offset=0):
+        """[(movie_id, score), ...] by descending cosine similarity to `query`."""
+        state = self.refresh()
+        seg = state.segment
+        qvec = tfidf_vector(query, seg.idf_of)
+
+        acc = {}
+        for term, qw in qvec.items():
+            i = seg.terms.get(term)
+            if i is None:
+                continue
+            start, end = seg.offsets[i], seg.offsets[i + 1]
+            for d, w in zip(seg.docs[start:end], seg.weights[start:end]):
+                acc[d] = acc.get(d, 0.0) + qw * w
+
+        doc_ids, delta = seg.doc_ids, state.delta
+        scores = {}
+        for d, score in acc.items():
+            mid = doc_ids[d]
+            if mid not in delta:
+                scores[mid] = score
+        for term, qw in qvec.items():
+            for mid, w in state.inverted.get(term, {}).items():
+                scores[mid] = scores.get(mid, 0.0) + qw * w
+
+        best = heapq.nlargest(offset + limit, scores.items(), key=lambda kv: kv[1])
+        return best[offset:]
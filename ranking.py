@@ -0,0 +1,76 @@
+"""
+ranking.py
+Score-accumulating top-k ranker for recommendations.
+
+Every watchlist entry ("source") contributes its feedback weight to each
+candidate it recommends, so a film suggested by ten liked titles outranks
+one suggested once. Candidates already in the watchlist are dropped, and
+only the requested page is selected (heap-based top-k, no full sort).
+"""
+
+import heapq
+
+def feedback_weight(feedback):
+    """
+    Weight of a watchlist entry's recommendations, or None to skip it.
+      - 'not_interested' => skipped
+      - 'like'           => 2.0
+      - 'rated_X'        => X/5
+      - anything else    => 1.0
+    """
+    if feedback == "not_interested":
+        return None
+    if feedback == "like":
+        return 2.0
+    if feedback and feedback.startswith("rated_"):
+        try:
+            return int(feedback.split("_")[1]) / 5.0
+        except ValueError:
+            pass
+    return 1.0
+
+class Ranker:
+    def __init__(self, exclude=()):
+        self.exclude = set(exclude)
+        # candidate id -> accumulated score
+        self.scores = {}
+        # candidate id -> [{"source": id, "weight": w}, ...]
+        self.contributions = {}
+        # candidate id -> first payload seen (used for rendering)
+        self.items = {}
+        # candidate id -> first-seen order, for stable tie-breaking
+        self._order = {}
+
+    def add(self, source_id, weight, candidates, scores=None):
+        """
+        Adds `weight` to every candidate (TMDb movie dict) from one source.
+        `scores`, if given, is parallel to `candidates` and scales the weight
+        per candidate (e.g. graph walk scores).
+        """
+        for i, cand in enumerate(candidates):
+            cid = cand.get("id")
+            if cid is None or cid in self.exclude:
+                continue
+            if cid not in self.scores:
+                self.scores[cid] = 0.0
+                self.contributions[cid] = []
+                self.items[cid] = cand
+                self._order[cid] = len(self._order)
+            amount = weight * scores[i] if scores is not None else weight
+            self.scores[cid] += amount
+            self.contributions[cid].append({"source": source_id, "weight": amount})
+
+    def __len__(self):
+        return len(self.scores)
+
+    def top(self, limit, offset=0):
+        """
+        The page [offset, offset + limit) of candidates by descending score
+        (ties keep first-seen order), as [(candidate_id, score), ...].
+        """
+        if limit <= 0:
+            return []
+        order = self._order
+        best = heapq.nlargest(offset + limit, self.scores.items(),
+                              key=lambda kv: (kv[1], -order[kv[0]]))
+        return best[offset:]
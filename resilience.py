@@ -0,0 +1,151 @@
+"""
+resilience.py
+Building blocks for calling an unreliable upstream (TMDb):
+ - ResponseCache: bounded LRU of upstream payloads with their fetch time,
+   used for fresh hits, stale-while-revalidate and negative (404) caching
+ - TieredCache: a ResponseCache in front of a cross-worker tier
+   (sharedcache.SharedCache), presented as one cache
+ - CircuitBreaker: fails fast once the recent error rate crosses a threshold
+
+All are thread-safe; ResponseCache and CircuitBreaker are process-local.
+"""
+
+import threading
+import time
+from collections import OrderedDict, deque, namedtuple
+
+# payload: decoded JSON (None for negative entries); status: upstream HTTP status
+CacheEntry = namedtuple("CacheEntry", "payload status stored_at")
+
+class ResponseCache:
+    def __init__(self, max_entries=4096):
+        self.max_entries = max_entries
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None:
+                self._data.move_to_end(key)
+            return entry
+
+    def set(self, key, payload, status=200, stored_at=None):
+        if stored_at is None:
+            stored_at = time.monotonic()
+        with self._lock:
+            self._data[key] = CacheEntry(payload, status, stored_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def __len__(self):
+        return len(self._data)
+
+class TieredCache:
+    """
+    Process-local LRU first, then the shared tier. A shared hit is copied
+    into the local tier with its original fetch time, so freshness and
+    stale-while-revalidate work the same whichever worker fetched it.
+    A local entry past `fresh_ttl` (`negative_ttl` for 404s) is checked
+    against the shared tier too: another worker may already have
+    refreshed it, and then this one need not call upstream again.
+    """
+    def __init__(self, local, shared, fresh_ttl=600, negative_ttl=60):
+        self.local = local
+        self.shared = shared
+        self.fresh_ttl = fresh_ttl
+        self.negative_ttl = negative_ttl
+
+    def get(self, key):
+        entry = self.local.get(key)
+        if entry is not None:
+            ttl = self.fresh_ttl if entry.status == 200 else self.negative_ttl
+            if time.monotonic() - entry.stored_at < ttl:
+                return entry
+        shared = self.shared.get(key)
+        if shared is not None and (entry is None or shared.stored_at > entry.stored_at):
+            self.local.set(key, shared.payload, shared.status, shared.stored_at)
+            return shared
+        return entry
+
+    def set(self, key, payload, status=200):
+        self.local.set(key, payload, status)
+        self.shared.set(key, payload, status)
+
+    def __len__(self):
+        return len(self.local)
+
+class CircuitBreaker:
+    """
+    closed    -> calls flow; outcomes are tracked over the last `window` seconds
+    open      -> once >= `min_calls` outcomes with failure ratio >= `threshold`;
+                 calls fail fast for `cooldown` seconds
+    half_open -> after the cooldown a single trial call is let through;
+                 success closes the circuit, failure re-opens it
+    """
+    CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+    def __init__(self, threshold=0.5, min_calls=10, window=30.0, cooldown=30.0):
+        self.threshold = threshold
+        self.min_calls = min_calls
+        self.window = window
+        self.cooldown = cooldown
+        self.state = self.CLOSED
+        self._opened_at = 0.0
+        self._outcomes = deque()  # (timestamp, ok)
+        self._lock = threading.Lock()
+
+    def is_open(self):
+        """True while calls should fail fast (does not consume the half-open trial)."""
+        with self._lock:
+            if self.state == self.CLOSED:
+                return False
+            if self.state == self.OPEN:
+                return time.monotonic() - self._opened_at < self.cooldown
+            return True  # half-open: the trial call is already in flight
+
+    def allow(self):
+        """True if a call may go upstream now."""
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.OPEN and time.monotonic() - self._opened_at >= self.cooldown:
+                self.state = self.HALF_OPEN
+                return True
+            return False
+
+    def record(self, ok):
+        """
+        Records a call outcome. ok=None means the call proved nothing about
+        upstream (e.g. cut short by a client deadline): it is not counted,
+        and a half-open trial is handed back for the next call.
+        """
+        now = time.monotonic()
+        with self._lock:
+            if ok is None:
+                if self.state == self.HALF_OPEN:
+                    self.state = self.OPEN  # cooldown already over: next allow() retries
+                return
+            if self.state == self.HALF_OPEN:
+                if ok:
+                    self.state = self.CLOSED
+                    self._outcomes.clear()
+                else:
+                    self._trip(now)
+                return
+
+            self._outcomes.append((now, ok))
+            while self._outcomes and now - self._outcomes[0][0] > self.window:
+                self._outcomes.popleft()
+            total = len(self._outcomes)
+            failures = sum(1 for _, good in self._outcomes if not good)
+            if self.state == self.CLOSED and total >= self.min_calls \
+                    and failures / total >= self.threshold:
+                self._trip(now)
+
+    def _trip(self, now):
+        self.state = self.OPEN
+        self._opened_at = now
+        self._outcomes.clear()
+        print(f"[TMDb] circuit open for {self.cooldown:.0f}s")
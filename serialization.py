@@ -0,0 +1,87 @@
+"""
+serialization.py
+JSON output helpers for the API routes:
+ - A pluggable JSON provider: orjson when it is installed (optional
+   dependency), otherwise Flask's standard-library provider
+ - `fields=` response projection so clients only receive what they render
+
+Field names are matched case-insensitively with spaces treated as
+underscores, so `fields=title,poster_url` works for both search results
+("title", "poster_url") and movie details ("Title", "Poster URL").
+"""
+
+from flask.json.provider import DefaultJSONProvider
+
+# -------------------------------------------------------------------------
+# JSON PROVIDERS
+# -------------------------------------------------------------------------
+class OrjsonProvider(DefaultJSONProvider):
+    """
+    Flask JSON provider backed by orjson.
+    Responses are written straight from orjson's bytes (no str round trip);
+    calls with stdlib-only keyword arguments fall back to the default provider.
+    """
+    def __init__(self, app):
+        super().__init__(app)
+        import orjson
+        self._orjson = orjson
+
+    def _option(self):
+        option = self._orjson.OPT_NON_STR_KEYS
+        if self.sort_keys:
+            option |= self._orjson.OPT_SORT_KEYS
+        return option
+
+    def dumps(self, obj, **kwargs):
+        if kwargs:
+            return super().dumps(obj, **kwargs)
+        return self._orjson.dumps(obj, default=self.default, option=self._option()).decode()
+
+    def loads(self, s, **kwargs):
+        if kwargs:
+            return super().loads(s, **kwargs)
+        return self._orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        body = self._orjson.dumps(obj, default=self.default, option=self._option())
+        return self._app.response_class(body + b"\n", mimetype=self.mimetype)
+
+def make_json_provider(app, name="auto"):
+    """
+    JSON provider for `app`.
+    name: "orjson", "std", or "auto" (orjson if importable, else std).
+    """
+    if name in ("auto", "orjson"):
+        try:
+            return OrjsonProvider(app)
+        except ImportError:
+            if name == "orjson":
+                raise
+    return DefaultJSONProvider(app)
+
+# -------------------------------------------------------------------------
+# FIELD PROJECTION
+# -------------------------------------------------------------------------
+def _norm(key):
+    return key.strip().lower().replace(" ", "_")
+
+def parse_fields(raw):
+    """
+    Parses a `fields=a,b,c` query value into a set of normalized names.
+    Returns None (meaning "all fields") when the parameter is absent or empty.
+    """
+    if not raw:
+        return None
+    fields = {_norm(f) for f in raw.split(",") if f.strip()}
+    return fields or None
+
+def wants(fields, name):
+    """True if `name` is requested (always true when no projection is given)."""
+    return fields is None or _norm(name) in fields
+
+def project(item, fields):
+    """Returns `item` restricted to the requested fields (unchanged if None)."""
+    if fields is None:
+        return item
+    return {k: v for k, v in item.items() if _norm(k) in fields}
@@ -0,0 +1,236 @@
+"""
+sharedcache.py
+Cross-worker cache tier for upstream (TMDb) payloads: one memory-mapped
+file that every worker process on the host maps, so a payload fetched by
+one worker is a hit in all of them, and the cache is not duplicated per
+worker. Used behind the per-process ResponseCache (resilience.TieredCache).
+
+File layout (host byte order; a host-local cache, not a portable format):
+    header  magic, n_slots, data_size, cursor (total bytes ever written)
+    index   n_slots x (version, length, key hash, position) - open
+            addressing, linear probing over at most MAX_PROBE slots
+    data    ring buffer of records (key, JSON payload, status, stored time)
+
+Eviction is size-bounded FIFO: records are appended at the cursor and the
+ring overwrites the oldest bytes when it wraps. A record at absolute
+position p is intact while cursor <= p + data_size.
+
+A file with another geometry (size / slot count) is never resized in
+place, since processes still mapping it would fault: a new file is built
+and renamed over it, and old mappings keep the old inode until they exit.
+
+Writers (any thread, any process) serialize on a POSIX record lock of the
+mapped file (per process, so forked workers don't share it) plus a thread
+lock. They advance the cursor *before* overwriting bytes, and
+publish a slot under a seqlock (version odd while it is being written).
+Readers take no lock: they read the slot twice-versioned, check the key
+bytes, decode the payload straight from the mapping, then re-check the
+cursor. Anything torn or overwritten mid-read is simply a miss.
+"""
+
+import fcntl
+import hashlib
+import json
+import mmap
+import os
+import struct
+import threading
+import time
+
+from resilience import CacheEntry
+
+try:
+    import orjson
+except ImportError:  # optional: decode from the mapping without a bytes copy
+    orjson = None
+
+MAGIC = b"CMSHC001"
+HEADER = struct.Struct("=8sIIQQ")      # magic, n_slots, pad, data_size, cursor
+CURSOR_OFFSET = 24
+SLOT = struct.Struct("=IIQQ8x")        # version, length, key hash, position
+RECORD = struct.Struct("=IIdH6x")      # key length, payload length, stored (wall), status
+MAX_PROBE = 16
+ALIGN = 8
+
+def _key_bytes(key):
+    return json.dumps(key, separators=(",", ":"), default=str).encode("utf-8")
+
+def _key_hash(data):
+    h = int.from_bytes(hashlib.blake2b(data, digest_size=8).digest(), "little")
+    return h or 1  # 0 marks an empty slot
+
+def _dumps(payload):
+    if orjson is not None:
+        return orjson.dumps(payload)
+    return json.dumps(payload, separators=(",", ":")).encode("utf-8")
+
+def _loads(view):
+    if orjson is not None:
+        return orjson.loads(view)
+    return json.loads(bytes(view))
+
+class SharedCache:
+    def __init__(self, path, size=64 * 2**20, slots=65536):
+        """
+        Opens (or creates) the cache file at `path`: `slots` index entries
+        (rounded up to a power of two) and about `size` bytes of payload data.
+        Open it before forking workers; the mapping is inherited.
+        """
+        self.path = path
+        n_slots = 1 << max(4, (slots - 1).bit_length())
+        data_size = max(size, 1 << 16) // ALIGN * ALIGN
+        self._index_at = HEADER.size
+        self._data_at = HEADER.size + n_slots * SLOT.size
+        total = self._data_at + data_size
+
+        self._thread_lock = threading.Lock()
+        header = HEADER.pack(MAGIC, n_slots, 0, data_size, 0)
+        while True:
+            fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+            keep = False
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX)  # serializes setup only
+                if os.fstat(fd).st_ino != os.stat(path).st_ino:
+                    continue  # replaced while we waited: open the new one
+                size = os.fstat(fd).st_size
+                if size == 0:
+                    # brand-new file: nobody can have it mapped yet
+                    os.ftruncate(fd, total)
+                    os.pwrite(fd, header, 0)
+                elif size != total or os.pread(fd, CURSOR_OFFSET, 0) != header[:CURSOR_OFFSET]:
+                    # another geometry, possibly mapped by running workers: swap in a new file
+                    tmp = f"{path}.{os.getpid()}.tmp"
+                    tmp_fd = os.open(tmp, os.O_RDWR | os.O_CREAT | os.O_TRUNC, 0o600)
+                    try:
+                        os.ftruncate(tmp_fd, total)
+                        os.pwrite(tmp_fd, header, 0)
+                    finally:
+                        os.close(tmp_fd)
+                    os.replace(tmp, path)
+                    print(f"[Cache] {path}: geometry changed, started a new cache file")
+                    continue
+                self._mm = mmap.mmap(fd, total, mmap.MAP_SHARED,
+                                     mmap.PROT_READ | mmap.PROT_WRITE)
+                keep = True
+                break
+            finally:
+                fcntl.flock(fd, fcntl.LOCK_UN)
+                if not keep:
+                    os.close(fd)
+        # kept open: writers lock this inode, the one that is mapped
+        self._fd = fd
+        self.n_slots = n_slots
+        self.data_size = data_size
+        self.max_record = data_size // 4
+        self.hits = 0
+        self.misses = 0
+
+    # ---------------------------------------------------------------------
+    # Helpers
+    # ---------------------------------------------------------------------
+    def _cursor(self):
+        return struct.unpack_from("=Q", self._mm, CURSOR_OFFSET)[0]
+
+    def _slot_at(self, h, i):
+        return self._index_at + ((h + i) & (self.n_slots - 1)) * SLOT.size
+
+    def _read_slot(self, at):
+        """(length, key hash, position), or None while a writer holds the slot."""
+        version, length, key_hash, pos = SLOT.unpack_from(self._mm, at)
+        if version & 1 or struct.unpack_from("=I", self._mm, at)[0] != version:
+            return None
+        return length, key_hash, pos
+
+    # ---------------------------------------------------------------------
+    # API (same shape as ResponseCache)
+    # ---------------------------------------------------------------------
+    def get(self, key):
+        kb = _key_bytes(key)
+        h = _key_hash(kb)
+        mm = self._mm
+        for i in range(MAX_PROBE):
+            slot = self._read_slot(self._slot_at(h, i))
+            if slot is None:
+                continue
+            length, key_hash, pos = slot
+            if key_hash == 0:
+                break
+            if key_hash != h:
+                continue
+            if self._cursor() > pos + self.data_size:
+                break  # evicted
+            at = self._data_at + pos % self.data_size
+            try:
+                key_len, payload_len, stored, status = RECORD.unpack_from(mm, at)
+                start = at + RECORD.size
+                if key_len != len(kb) or RECORD.size + key_len + payload_len > length \
+                        or mm[start:start + key_len] != kb:
+                    break
+                payload = _loads(memoryview(mm)[start + key_len:start + key_len + payload_len])
+            except (ValueError, struct.error):
+                break
+            if self._cursor() > pos + self.data_size:
+                break  # overwritten while we read it
+            self.hits += 1
+            # stored as wall-clock time (shared across processes); callers use monotonic
+            return CacheEntry(payload, status, time.monotonic() - (time.time() - stored))
+        self.misses += 1
+        return None
+
+    def set(self, key, payload, status=200):
+        """Stores a payload; returns False when it is too large for the ring."""
+        kb = _key_bytes(key)
+        body = _dumps(payload)
+        length = RECORD.size + len(kb) + len(body)
+        length += -length % ALIGN
+        if length > self.max_record:
+            return False
+        h = _key_hash(kb)
+        record = RECORD.pack(len(kb), len(body), time.time(), status) + kb + body
+        mm = self._mm
+        with self._thread_lock:
+            fcntl.lockf(self._fd, fcntl.LOCK_EX)
+            try:
+                cursor = self._cursor()
+                if cursor % self.data_size + length > self.data_size:
+                    cursor += self.data_size - cursor % self.data_size  # wrap to the start
+                # advance the cursor first so readers of the bytes we overwrite see it
+                struct.pack_into("=Q", mm, CURSOR_OFFSET, cursor + length)
+                at = self._data_at + cursor % self.data_size
+                mm[at:at + len(record)] = record
+
+                target = None
+                empty = stale = oldest = None
+                oldest_pos = None
+                for i in range(MAX_PROBE):
+                    slot_at = self._slot_at(h, i)
+                    _, _, key_hash, pos = SLOT.unpack_from(mm, slot_at)
+                    if key_hash == h:
+                        target = slot_at
+                        break
+                    if key_hash == 0:
+                        empty = slot_at
+                        break
+                    if stale is None and cursor > pos + self.data_size:
+                        stale = slot_at
+                    if oldest_pos is None or pos < oldest_pos:
+                        oldest, oldest_pos = slot_at, pos
+                target = target or empty or stale or oldest
+
+                version = struct.unpack_from("=I", mm, target)[0]
+                struct.pack_into("=I", mm, target, version + 1)           # odd: writing
+                SLOT.pack_into(mm, target, version + 1, length, h, cursor)
+                struct.pack_into("=I", mm, target, version + 2)           # even: published
+            finally:
+                fcntl.lockf(self._fd, fcntl.LOCK_UN)
+        return True
+
+    def __len__(self):
+        """Number of index slots holding a record that is still in the ring."""
+        cursor = self._cursor()
+        count = 0
+        for i in range(self.n_slots):
+            _, _, key_hash, pos = SLOT.unpack_from(self._mm, self._index_at + i * SLOT.size)
+            if key_hash and cursor <= pos + self.data_size:
+                count += 1
+        return count
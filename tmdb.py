@@ -0,0 +1,167 @@
+"""
+tmdb.py
+Small TMDb v3 client shared by the Flask routes.
+
+`requests` is imported and the pooled HTTP session is built on the first
+upstream call, not at import time, so create_app() stays cheap for
+pre-fork workers and test collection.
+
+Upstream resilience (see resilience.py):
+ - fresh cached payloads are served for `fresh_ttl` seconds
+ - up to `stale_ttl`, a stale payload is served immediately while a
+   background thread refreshes it
+ - 404s are cached for `negative_ttl` seconds
+ - a circuit breaker fails fast (503) while TMDb is erroring, serving any
+   cached payload, however old, instead of waiting on upstream
+ - `on_fetch(path, payload)`, if given, is called after each successful
+   upstream fetch (not on cache hits), including background refreshes
+ - with a `time_left` callable (admission.time_left), upstream calls are
+   bounded by the current request's deadline and skipped (504) once less
+   than `min_timeout` is left. A timeout caused by a client's short
+   deadline says nothing about TMDb, so it is not counted by the breaker
+"""
+
+import threading
+import time
+
+from resilience import CircuitBreaker, ResponseCache
+
+POSTER_BASE_URL = "https://image.tmdb.org/t/p/w500"
+NO_POSTER_URL = "https://via.placeholder.com/500x750?text=No+Image"
+
+class TMDbError(Exception):
+    """
+    Raised for any failed TMDb call.
+    `status_code` is the upstream HTTP status (503 when the circuit is
+    open), or None for network errors.
+    """
+    def __init__(self, message, status_code=None):
+        super().__init__(message)
+        self.status_code = status_code
+
+def poster_url(poster_path):
+    """Full poster URL for a TMDb poster_path (or the placeholder)."""
+    return f"{POSTER_BASE_URL}{poster_path}" if poster_path else NO_POSTER_URL
+
+def _is_failure(status_code):
+    """Outcomes that count against the circuit breaker."""
+    return status_code is None or status_code == 429 or status_code >= 500
+
+class TMDbClient:
+    def __init__(self, api_key, base_url="https://api.themoviedb.org/3",
+                 language="en-US", timeout=10, cache=None, breaker=None,
+                 fresh_ttl=600, stale_ttl=86400, negative_ttl=60, time_left=None,
+                 min_timeout=0.25, on_fetch=None):
+        self.api_key = api_key
+        self.base_url = base_url
+        self.language = language
+        self.timeout = timeout
+        self.cache = cache if cache is not None else ResponseCache()
+        self.breaker = breaker if breaker is not None else CircuitBreaker()
+        self.fresh_ttl = fresh_ttl
+        self.stale_ttl = stale_ttl
+        self.negative_ttl = negative_ttl
+        self.time_left = time_left
+        self.min_timeout = min_timeout
+        self.on_fetch = on_fetch
+        self._session = None
+        self._refreshing = set()
+        self._refresh_lock = threading.Lock()
+
+    def _get_session(self):
+        if self._session is None:
+            import requests
+            self._session = requests.Session()
+        return self._session
+
+    def get(self, path, **params):
+        """
+        GET {base_url}{path} and return the decoded JSON body, from cache
+        when possible. Returned payloads are shared: treat them as read-only.
+        Raises TMDbError on HTTP or network failure.
+        """
+        key = (path, tuple(sorted(params.items())))
+        entry = self.cache.get(key)
+        if entry is not None:
+            age = time.monotonic() - entry.stored_at
+            if entry.status == 200:
+                if age < self.fresh_ttl:
+                    return entry.payload
+                if self.breaker.is_open():
+                    return entry.payload
+                if age < self.stale_ttl:
+                    self._refresh_async(key, path, params)
+                    return entry.payload
+            elif entry.status == 404 and age < self.negative_ttl:
+                raise TMDbError(f"TMDb HTTP error: 404 (cached) for {path}", 404)
+
+        timeout = self.timeout
+        left = self.time_left() if self.time_left is not None else None
+        if left is not None:
+            if left < self.min_timeout:
+                # the client has (all but) given up: don't spend an upstream call on it
+                if entry is not None and entry.status == 200:
+                    return entry.payload
+                raise TMDbError(f"Request deadline passed before calling TMDb for {path}", 504)
+            timeout = min(timeout, left)
+
+        if not self.breaker.allow():
+            raise TMDbError("TMDb unavailable (circuit open)", 503)
+        try:
+            return self._fetch(key, path, params, timeout)
+        except TMDbError as err:
+            # upstream failing: an old payload beats an error
+            if entry is not None and entry.status == 200 and _is_failure(err.status_code):
+                return entry.payload
+            if err.status_code is None and left is not None and self.time_left() <= 0:
+                raise TMDbError(f"Request deadline passed waiting for TMDb for {path}", 504) from err
+            raise
+
+    def _fetch(self, key, path, params, timeout=None):
+        session = self._get_session()
+        import requests  # already loaded by _get_session()
+
+        query = {"api_key": self.api_key, "language": self.language}
+        query.update(params)
+        status = None
+        deadline_cut = False  # timed out only because the request deadline shortened the call
+        try:
+            resp = session.get(f"{self.base_url}{path}", params=query,
+                               timeout=self.timeout if timeout is None else timeout)
+            status = resp.status_code
+            resp.raise_for_status()
+            payload = resp.json()
+            self.cache.set(key, payload, 200)
+            if self.on_fetch is not None:
+                self.on_fetch(path, payload)
+            return payload
+        except requests.exceptions.HTTPError as http_err:
+            if status == 404:
+                self.cache.set(key, None, 404)
+            raise TMDbError(f"TMDb HTTP error: {http_err}", status) from http_err
+        except requests.exceptions.RequestException as e:
+            status = None
+            deadline_cut = (isinstance(e, requests.exceptions.Timeout)
+                            and timeout is not None and timeout < self.timeout)
+            raise TMDbError(str(e)) from e
+        finally:
+            self.breaker.record(None if deadline_cut else not _is_failure(status))
+
+    def _refresh_async(self, key, path, params):
+        """Refreshes a stale entry in the background (one refresh per key at a time)."""
+        with self._refresh_lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+
+        def refresh():
+            try:
+                if self.breaker.allow():
+                    self._fetch(key, path, params)
+            except TMDbError as e:
+                print(f"[TMDb] background refresh of {path} failed: {e}")
+            finally:
+                with self._refresh_lock:
+                    self._refreshing.discard(key)
+
+        threading.Thread(target=refresh, name="tmdb-refresh", daemon=True).start()
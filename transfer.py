@@ -0,0 +1,184 @@
+"""
+transfer.py
+Streaming watchlist export / import in NDJSON and CSV.
+
+Export walks a SQLite cursor with fetchmany(), so only one batch of rows is
+in memory at a time. Import consumes an iterable of text lines (e.g. the
+request body), validates each record, and commits fixed-size batches.
+"""
+
+import csv
+import io
+
+COLUMNS = ("movie_id", "favourite", "rating", "feedback")
+FORMATS = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+# Keep at most this many row errors in an import report.
+MAX_REPORTED_ERRORS = 20
+SQLITE_INT_MAX = 2**63 - 1  # INTEGER columns are signed 64-bit
+
+# -------------------------------------------------------------------------
+# EXPORT
+# -------------------------------------------------------------------------
+def iter_rows(conn, user_id, batch_size=500):
+    """Yields the user's watchlist rows as dicts, `batch_size` at a time from the cursor."""
+    c = conn.execute("""
+        SELECT movie_id, favourite, rating, feedback
+        FROM watchlist WHERE user_id = ? ORDER BY movie_id
+    """, (user_id,))
+    while True:
+        batch = c.fetchmany(batch_size)
+        if not batch:
+            break
+        for movie_id, favourite, rating, feedback in batch:
+            yield {"movie_id": movie_id, "favourite": bool(favourite),
+                   "rating": rating, "feedback": feedback}
+
+def ndjson_lines(rows, dumps):
+    for row in rows:
+        yield dumps(row) + "\n"
+
+def csv_lines(rows):
+    buf = io.StringIO()
+    writer = csv.writer(buf, lineterminator="\n")
+    writer.writerow(COLUMNS)
+    for row in rows:
+        writer.writerow([
+            row["movie_id"],
+            int(row["favourite"]),
+            row["rating"],
+            "" if row["feedback"] is None else row["feedback"],
+        ])
+        yield buf.getvalue()
+        buf.seek(0)
+        buf.truncate()
+    tail = buf.getvalue()
+    if tail:
+        yield tail
+
+# -------------------------------------------------------------------------
+# IMPORT
+# -------------------------------------------------------------------------
+def iter_lines(stream, chunk_size=64 * 1024):
+    """
+    Splits a binary stream (e.g. request.stream) into text lines, reading
+    large chunks instead of byte-at-a-time readline(). Undecodable bytes
+    are replaced, so they surface as per-line parse errors.
+    """
+    pending = b""
+    while True:
+        chunk = stream.read(chunk_size)
+        if not chunk:
+            break
+        pending += chunk
+        *lines, pending = pending.split(b"\n")
+        for line in lines:
+            yield line.decode("utf-8", errors="replace") + "\n"
+    if pending:
+        yield pending.decode("utf-8", errors="replace")
+
+def parse_ndjson(lines, loads):
+    """Yields (line_no, record-or-ValueError) for each non-blank line."""
+    for line_no, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        try:
+            record = loads(line)
+            if not isinstance(record, dict):
+                raise ValueError("expected a JSON object")
+            yield line_no, record
+        except ValueError as e:
+            yield line_no, ValueError(f"invalid JSON: {e}")
+
+def parse_csv(lines):
+    """Yields (line_no, record) for each data row; the first row is the header."""
+    reader = csv.DictReader(lines)
+    for record in reader:
+        yield reader.line_num, record
+
+def normalize(record):
+    """
+    Validates one imported record into a (movie_id, favourite, rating, feedback)
+    tuple. Raises ValueError with a short reason on bad input.
+    """
+    try:
+        movie_id = int(record.get("movie_id") or record.get("movieId"))
+    except (TypeError, ValueError):
+        raise ValueError("movie_id must be an integer")
+    if movie_id <= 0:
+        raise ValueError("movie_id must be positive")
+    if movie_id > SQLITE_INT_MAX:
+        raise ValueError("movie_id is out of range")
+
+    fav = record.get("favourite", 0)
+    if isinstance(fav, str):
+        fav = fav.strip().lower() in ("1", "true", "yes")
+    favourite = 1 if fav else 0
+
+    try:
+        rating = int(record.get("rating") or 0)
+    except (TypeError, ValueError):
+        raise ValueError("rating must be an integer")
+    if not -SQLITE_INT_MAX - 1 <= rating <= SQLITE_INT_MAX:
+        raise ValueError("rating is out of range")
+
+    feedback = record.get("feedback") or None
+    if feedback is not None and not isinstance(feedback, str):
+        raise ValueError("feedback must be a string")
+    return movie_id, favourite, rating, feedback
+
+def iter_import(conn, user_id, records, batch_size=500):
+    """
+    Upserts parsed `records` ((line_no, dict-or-error) pairs) into the user's
+    watchlist, committing every `batch_size` rows. Yields a progress dict
+    {imported, skipped, batches} after each commit, then the summary (the
+    same counts plus `errors`) last.
+    """
+    sql = """
+        INSERT INTO watchlist (user_id, movie_id, favourite, rating, feedback)
+        VALUES (?, ?, ?, ?, ?)
+        ON CONFLICT (user_id, movie_id) DO UPDATE SET
+            favourite = excluded.favourite,
+            rating = excluded.rating,
+            feedback = excluded.feedback
+    """
+    imported = skipped = batches = 0
+    errors = []
+    batch = []
+
+    def commit():
+        nonlocal imported, batches, batch
+        with conn:
+            conn.executemany(sql, batch)
+        imported += len(batch)
+        batches += 1
+        batch = []
+        return {"imported": imported, "skipped": skipped, "batches": batches}
+
+    for line_no, record in records:
+        try:
+            if isinstance(record, Exception):
+                raise record
+            batch.append((user_id,) + normalize(record))
+        except ValueError as e:
+            skipped += 1
+            if len(errors) < MAX_REPORTED_ERRORS:
+                errors.append({"line": line_no, "error": str(e)})
+            continue
+        if len(batch) >= batch_size:
+            yield commit()
+    if batch:
+        yield commit()
+    yield {"imported": imported, "skipped": skipped, "batches": batches, "errors": errors}
+
+def import_records(conn, user_id, records, batch_size=500, on_batch=None):
+    """
+    iter_import() run to completion; `on_batch(imported)` is called after
+    each commit. Returns the summary dict.
+    """
+    for report in iter_import(conn, user_id, records, batch_size):
+        if on_batch and "errors" not in report:
+            on_batch(report["imported"])
+    return report
@@ -0,0 +1,196 @@
+"""
+writebehind.py
+Optional write-behind queue for high-frequency watchlist updates
+(star ratings and feedback).
+
+Updates are acknowledged as soon as they are queued. Pending values are
+coalesced per (user_id, movie_id, field) -- last write wins -- and flushed
+to SQLite by a background thread in one transaction per shard, either every
+`interval` seconds or as soon as `max_pending` rows are waiting.
+
+Reads stay consistent by overlaying queued values (see pending_for()) on
+top of what is in the database. That only works within one process, so
+with a `lock_path` the queue claims the data for its process: the first
+process to start a queue owns it, and any other process that starts one
+registers as a contender and writes through. Once the owner sees a
+contender (shared()), it flushes and writes through too, so in a
+multi-worker deployment every worker ends up reading committed data.
+close() performs a final flush and is
+registered with atexit so a clean worker shutdown doesn't drop updates.
+"""
+
+import atexit
+import os
+import sqlite3
+import threading
+from collections import defaultdict
+
+import db
+
+try:
+    import fcntl
+except ImportError:  # Windows: no pre-fork servers, nothing to detect
+    fcntl = None
+
+# Columns that may be written behind; anything else goes straight to SQLite.
+FIELDS = ("rating", "feedback")
+
+class WriteBehindQueue:
+    def __init__(self, store, interval=0.5, max_pending=500, lock_path=None):
+        self.store = store
+        self.interval = interval
+        self.max_pending = max_pending
+        self._shared = False
+        self._lock_fd = None
+        if lock_path and fcntl is not None:
+            self._claim(lock_path)
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._closed = False
+        # (user_id, movie_id) -> {field: value}
+        self._pending = {}
+        # batch currently being written; still visible to readers until committed
+        self._flushing = {}
+        self._thread = threading.Thread(target=self._run, name="write-behind", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    # ---------------------------------------------------------------------
+    # Process ownership (POSIX record locks: per process, released on exit)
+    # ---------------------------------------------------------------------
+    def _claim(self, lock_path):
+        """Byte 0 held exclusively by the owner; byte 1 held shared by contenders."""
+        self._lock_fd = os.open(lock_path, os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            fcntl.lockf(self._lock_fd, fcntl.LOCK_EX | fcntl.LOCK_NB, 1, 0)
+        except OSError:
+            fcntl.lockf(self._lock_fd, fcntl.LOCK_SH, 1, 1)
+            self._shared = True
+            print(f"[WriteBehind] another process queues writes for this data; "
+                  f"pid {os.getpid()} writes through (WRITE_BEHIND needs a single worker)")
+
+    def shared(self):
+        """True once another process also uses write-behind on this data."""
+        if self._shared or self._lock_fd is None:
+            return self._shared
+        try:
+            fcntl.lockf(self._lock_fd, fcntl.LOCK_EX | fcntl.LOCK_NB, 1, 1)
+        except OSError:
+            self._shared = True
+            print(f"[WriteBehind] other worker processes found; "
+                  f"pid {os.getpid()} flushes and writes through from now on")
+        else:
+            fcntl.lockf(self._lock_fd, fcntl.LOCK_UN, 1, 1)
+        return self._shared
+
+    # ---------------------------------------------------------------------
+    # Producer side
+    # ---------------------------------------------------------------------
+    def put(self, user_id, movie_id, field, value):
+        """Queues `field = value` for one watchlist row (last write wins)."""
+        if field not in FIELDS:
+            raise ValueError(f"{field!r} is not a write-behind field")
+        with self._lock:
+            self._pending.setdefault((user_id, movie_id), {})[field] = value
+            full = len(self._pending) >= self.max_pending
+        if full:
+            self._wake.set()
+
+    def discard(self, user_id, movie_id):
+        """Drops queued updates for a row that is being removed."""
+        try:
+            movie_id = int(movie_id)  # queue keys are the DB's integer ids
+        except (TypeError, ValueError):
+            return
+        with self._lock:
+            self._pending.pop((user_id, movie_id), None)
+
+    def pending_for(self, user_id):
+        """{movie_id: {field: value}} not yet committed for `user_id`."""
+        out = {}
+        with self._lock:
+            for source in (self._flushing, self._pending):
+                for (uid, mid), fields in source.items():
+                    if uid == user_id:
+                        out.setdefault(mid, {}).update(fields)
+        return out
+
+    def overlay(self, user_id, rows):
+        """
+        Returns `rows` (dicts with a movie_id key) with queued values applied,
+        so reads see the user's latest writes acknowledged by this process.
+        """
+        pending = self.pending_for(user_id)
+        if not pending:
+            return rows
+        for row in rows:
+            fields = pending.get(row["movie_id"])
+            if fields:
+                row.update(fields)
+        return rows
+
+    # ---------------------------------------------------------------------
+    # Flushing
+    # ---------------------------------------------------------------------
+    def flush(self):
+        """
+        Writes everything queued so far, one transaction per shard.
+        Rows from a shard whose write fails are re-queued (behind any newer
+        values) and retried on the next flush. Returns rows committed.
+        """
+        with self._flush_lock:
+            with self._lock:
+                if not self._pending:
+                    return 0
+                self._flushing, self._pending = self._pending, {}
+                batch = self._flushing
+
+            by_path = defaultdict(list)
+            for (user_id, movie_id), fields in batch.items():
+                by_path[self.store.path_for(user_id)].append((user_id, movie_id, fields))
+
+            written = 0
+            failed = {}
+            for path, items in by_path.items():
+                try:
+                    conn = db.connect(path)
+                    try:
+                        with conn:
+                            for field in FIELDS:
+                                params = [(f[field], uid, mid) for uid, mid, f in items if field in f]
+                                if params:
+                                    conn.executemany(
+                                        f"UPDATE watchlist SET {field} = ? WHERE user_id = ? AND movie_id = ?",
+                                        params)
+                    finally:
+                        conn.close()
+                    written += len(items)
+                except sqlite3.Error as db_err:
+                    print(f"[WriteBehind] flush error on {path}: {db_err}")
+                    for uid, mid, fields in items:
+                        failed[(uid, mid)] = fields
+
+            with self._lock:
+                for key, fields in failed.items():
+                    # newer queued values win over the failed batch
+                    merged = dict(fields)
+                    merged.update(self._pending.get(key, {}))
+                    self._pending[key] = merged
+                self._flushing = {}
+            return written
+
+    def _run(self):
+        while not self._closed:
+            self._wake.wait(self.interval)
+            self._wake.clear()
+            self.flush()
+
+    def close(self):
+        """Stops the flusher thread and durably writes whatever is still queued."""
+        if self._closed:
+            return
+        self._closed = True
+        self._wake.set()
+        self._thread.join(timeout=max(self.interval * 2, 1.0))
+        self.flush()